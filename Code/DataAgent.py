@@ -1,7 +1,16 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import os
+import json
+import time
+import queue
+import atexit
+import threading
+from concurrent.futures import Future
+import tracing
+from symbols import SYMBOL_MASTER, load_resolver
+from intraday import IntradayStore
+from yahoo_fetcher import FetchError, NoDataError, get_fetcher
 
 # Mapping user-friendly names to Yahoo tickers
 INDIAN_TICKER_MAP = {
@@ -40,47 +49,438 @@ INDIAN_TICKER_MAP = {
     "STATE BANK": "SBIN.NS"
 }
 
+COLUMNS = ["Date","Ticker","Open","High","Low","Close","Volume"]
+PRICE_COLUMNS = ["Open","High","Low","Close"]
+
+# Prices are stored as int32 paise: exact to the 0.01 tick for any ticker,
+# up to about Rs 2.1 crore per share
+PRICE_SCALE = 100
+MAX_PRICE = np.iinfo("int32").max / PRICE_SCALE
+
+# Bar timeframes and the pandas period each coarser one is grouped by
+TIMEFRAMES = {"daily": None, "weekly": "W-FRI", "monthly": "M"}
+
+
+# --------------------------------------------------------
+# Compact in-memory layout of the master dataset
+# --------------------------------------------------------
+def compact_frame(df, paise=False):
+    """
+    Convert a master OHLCV frame to its compact layout:
+    datetime64 Date, categorical Ticker, int32 paise prices and int64 Volume.
+    Input prices are rupees, or already paise with paise=True (frames built
+    from compact ones). Bars with a missing price are dropped.
+    Rows are sorted by Ticker, Date.
+    """
+    df = df[COLUMNS].copy()
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    df = df.dropna(subset=["Date"])
+    df["Ticker"] = df["Ticker"].astype(str).astype("category")
+
+    prices = df[PRICE_COLUMNS].apply(pd.to_numeric, errors="coerce")
+    if not paise:
+        prices = (prices * PRICE_SCALE).round()
+    complete = prices.notna().all(axis=1)
+    df, prices = df[complete], prices[complete]
+    if len(prices) and prices.abs().max().max() > np.iinfo("int32").max:
+        raise ValueError(f"Price above Rs {MAX_PRICE:,.0f} cannot be stored.")
+    df[PRICE_COLUMNS] = prices.astype("int32")
+
+    df["Volume"] = pd.to_numeric(df["Volume"], errors="coerce").fillna(0).astype("int64")
+
+    df = df.sort_values(["Ticker","Date"], kind="stable")
+    return df.reset_index(drop=True)
+
+
+def to_rupees(df):
+    """Copy of a compact frame with float64 rupee prices, the unit the agents work in."""
+    out = df.copy()
+    for col in PRICE_COLUMNS:
+        out[col] = df[col].to_numpy(dtype="float64") / PRICE_SCALE
+    return out
+
+
+def resample_ohlcv(df, timeframe):
+    """
+    Aggregate daily bars (sorted by Ticker, Date) into weekly or monthly bars.
+    Each bar is labelled with the last trading day of its period. Applying it
+    to bars that are already at the target timeframe returns the same bars.
+    """
+    freq = TIMEFRAMES[timeframe]
+    if freq is None:
+        return df
+
+    period = df["Date"].dt.to_period(freq).rename("Period")
+    out = df.groupby([df["Ticker"], period], observed=True, sort=True).agg(
+        Date=("Date", "last"),
+        Open=("Open", "first"),
+        High=("High", "max"),
+        Low=("Low", "min"),
+        Close=("Close", "last"),
+        Volume=("Volume", "sum"),
+    )
+    return out.reset_index("Ticker").reset_index(drop=True)[COLUMNS]
+
+
+def update_aggregate(agg, daily, new_rows, timeframe):
+    """
+    Re-aggregate only the periods touched by new_rows (Ticker, Date pairs) from
+    the compact daily frame, leaving every other bar of agg as it is.
+    """
+    freq = TIMEFRAMES[timeframe]
+    tickers = new_rows["Ticker"].astype(str).unique()
+
+    def periods(df):
+        return pd.MultiIndex.from_arrays([df["Ticker"].astype(str), df["Date"].dt.to_period(freq)])
+
+    touched = periods(new_rows).unique()
+    daily = daily[daily["Ticker"].isin(tickers)]
+    daily = daily[periods(daily).isin(touched)]
+    stale = agg["Ticker"].isin(tickers).to_numpy(copy=True)
+    stale[stale] = periods(agg[stale]).isin(touched)
+
+    agg = pd.concat([agg[~stale].astype({"Ticker": str}),
+                     resample_ohlcv(daily, timeframe).astype({"Ticker": str})],
+                    ignore_index=True)
+    return compact_frame(agg, paise=True)
+
+
+def save_columns(df, directory, csv_path):
+    """
+    Store a compact frame as one .npy file per column so it can be memory-mapped.
+    meta.json is written last and records which CSV version the files mirror.
+    """
+    os.makedirs(directory, exist_ok=True)
+    arrays = {
+        "Date": df["Date"].to_numpy(dtype="datetime64[ns]"),
+        "Ticker": df["Ticker"].cat.codes.to_numpy(),
+    }
+    for col in PRICE_COLUMNS + ["Volume"]:
+        arrays[col] = df[col].to_numpy()
+    # Unique temp names: several sessions may rebuild a stale mirror at once
+    suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+    for col, arr in arrays.items():
+        tmp_path = os.path.join(directory, col + suffix + ".npy")
+        np.save(tmp_path, arr)
+        os.replace(tmp_path, os.path.join(directory, col + ".npy"))
+
+    meta = {
+        "rows": len(df),
+        "categories": list(df["Ticker"].cat.categories),
+        "price_unit": "paise",
+        "csv_mtime": os.path.getmtime(csv_path),
+    }
+    tmp_path = os.path.join(directory, "meta.json" + suffix)
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(directory, "meta.json"))
+
+
+def load_columns(directory, csv_path, mmap=True):
+    """Load a column store written by save_columns, or None if it is missing or stale."""
+    meta_path = os.path.join(directory, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta["csv_mtime"] != os.path.getmtime(csv_path) or meta.get("price_unit") != "paise":
+        return None
+
+    mode = "r" if mmap else None
+    arrays = {col: np.load(os.path.join(directory, col + ".npy"), mmap_mode=mode) for col in COLUMNS}
+    if any(len(arr) != meta["rows"] for arr in arrays.values()):
+        return None
+
+    arrays["Ticker"] = pd.Categorical.from_codes(arrays["Ticker"], categories=meta["categories"])
+    # copy=False keeps the memory-mapped arrays as the frame's backing store
+    return pd.DataFrame(arrays, columns=COLUMNS, copy=False)
+
+
+# --------------------------------------------------------
+# Concurrency: shared in-flight downloads and a single CSV writer
+# --------------------------------------------------------
+_inflight_lock = threading.Lock()
+_inflight = {}  # ticker -> [(start, end, Future)]
+
+
+def fetch_shared(fetch, ticker, start_date, end_date, persist=None):
+    """
+    Run fetch(ticker, start_date, end_date) unless an identical or wider download
+    of the same ticker is already in flight, in which case wait for that one.
+    The owner hands the frame to persist(frame), which returns a Future; the
+    download stays registered until that Future is done, so sessions starting
+    before the rows are on disk reuse it instead of downloading again.
+    Returns (frame, owner).
+    """
+    with _inflight_lock:
+        for start, end, future in _inflight.get(ticker, []):
+            if start <= start_date and end >= end_date:
+                break
+        else:
+            future = None
+        if future is None:
+            future = Future()
+            entry = (start_date, end_date, future)
+            _inflight.setdefault(ticker, []).append(entry)
+            owner = True
+        else:
+            owner = False
+
+    if not owner:
+        frame = future.result()
+        if frame.empty:
+            return frame, False
+        return frame[(frame["Date"] >= start_date) & (frame["Date"] <= end_date)], False
+
+    def release(_=None):
+        with _inflight_lock:
+            _inflight[ticker].remove(entry)
+            if not _inflight[ticker]:
+                del _inflight[ticker]
+
+    try:
+        frame = fetch(ticker, start_date, end_date)
+    except Exception as e:
+        future.set_exception(e)
+        release()
+        raise
+    future.set_result(frame)
+
+    if persist is not None and not frame.empty:
+        try:
+            persist(frame).add_done_callback(release)
+        except Exception:
+            release()
+            raise
+    else:
+        release()
+    return frame, True
+
+
+class PriceStoreWriter:
+    """
+    The only thread that writes a given master CSV.
+
+    Agents submit frames of new rows; the writer thread drains everything that
+    is pending, merges it into the master in one go, writes a temp file and
+    swaps it in with os.replace, so readers never see a partial CSV and
+    concurrent updates cannot overwrite each other. Every commit merges against
+    the master as it is on disk (the memory-mapped column mirror when it is
+    fresh), so no copy of the master stays resident between commits and
+    changes made by other processes are picked up. Weekly/monthly mirrors that
+    were fresh are updated for the touched periods in the same commit.
+    """
+
+    COALESCE_SECONDS = 0.05
+
+    def __init__(self, csv_path, columns_dir=None):
+        self.csv_path = csv_path
+        self.columns_dir = columns_dir
+        self.pending = queue.Queue()
+        threading.Thread(target=self._run, name=f"writer:{csv_path}", daemon=True).start()
+        atexit.register(self.flush)
+
+    def submit(self, rows):
+        """Queue new rows for the next commit. The returned Future resolves once they are on disk."""
+        future = Future()
+        self.pending.put((rows, future))
+        return future
+
+    def flush(self):
+        """Block until every submitted update has been committed."""
+        self.pending.join()
+
+    def _load(self):
+        if not os.path.exists(self.csv_path):
+            return compact_frame(pd.DataFrame(columns=COLUMNS))
+        if self.columns_dir:
+            data = load_columns(self.columns_dir, self.csv_path)
+            if data is not None:
+                return data
+        return compact_frame(pd.read_csv(self.csv_path))
+
+    def _run(self):
+        while True:
+            batch = [self.pending.get()]
+            # Let concurrent sessions pile up behind the first update, then take them all
+            time.sleep(self.COALESCE_SECONDS)
+            while True:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._commit([rows for rows, _ in batch])
+                for _, future in batch:
+                    future.set_result(self.csv_path)
+            except Exception as e:
+                print("Price store write failed:", e)
+                for _, future in batch:
+                    future.set_exception(e)
+            finally:
+                for _ in batch:
+                    self.pending.task_done()
+
+    def _commit(self, frames):
+        frames = [compact_frame(f).astype({"Ticker": str}) for f in frames]
+        merged = pd.concat([self._load().astype({"Ticker": str})] + frames, ignore_index=True)
+        merged = compact_frame(merged.drop_duplicates(["Date","Ticker"]), paise=True)
+
+        # Aggregate mirrors must be read before the CSV changes, or they look stale
+        aggregates = {}
+        if self.columns_dir and os.path.exists(self.csv_path):
+            new_rows = pd.concat([f[["Date","Ticker"]] for f in frames], ignore_index=True)
+            for timeframe, freq in TIMEFRAMES.items():
+                agg = load_columns(os.path.join(self.columns_dir, timeframe), self.csv_path) if freq else None
+                if agg is not None:
+                    aggregates[timeframe] = update_aggregate(agg, merged, new_rows, timeframe)
+
+        tmp_path = f"{self.csv_path}.{os.getpid()}.tmp"
+        to_rupees(merged).to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self.csv_path)
+
+        if self.columns_dir:
+            save_columns(merged, self.columns_dir, self.csv_path)
+            for timeframe, agg in aggregates.items():
+                save_columns(agg, os.path.join(self.columns_dir, timeframe), self.csv_path)
+        print(f"Committed {sum(len(f) for f in frames)} rows from {len(frames)} update(s) to {self.csv_path}")
+
+
+_writers_lock = threading.Lock()
+_writers = {}
+
+
+def get_writer(csv_path, columns_dir=None):
+    """Process-wide writer for csv_path, created on first use."""
+    key = os.path.abspath(csv_path)
+    with _writers_lock:
+        if key not in _writers:
+            _writers[key] = PriceStoreWriter(csv_path, columns_dir)
+        elif columns_dir:
+            _writers[key].columns_dir = columns_dir
+        return _writers[key]
+
+
+class IndicatorState:
+    """
+    Window state carried between chunks when compute_indicators runs chunk-wise:
+    the last closes (enough for the longest rolling window) and the last values
+    of the three EMAs, which are recursive.
+    """
+    TAIL = 20
+
+    def __init__(self):
+        self.tail = None
+        self.ema12 = None
+        self.ema26 = None
+        self.signal = None
+
+
+def _ewm(series, span, seed):
+    # adjust=False EMA continued from a previous value by prepending it as the first observation
+    if seed is None:
+        return series.ewm(span=span, adjust=False).mean()
+    seeded = pd.concat([pd.Series([seed]), series], ignore_index=True)
+    out = seeded.ewm(span=span, adjust=False).mean().iloc[1:]
+    out.index = series.index
+    return out
+
+
 class DataAgent:
-    def __init__(self, csv_path):
+    def __init__(self, csv_path, mmap=False, columns_dir=None, symbols_path=SYMBOL_MASTER,
+                 intraday_dir="intraday"):
+        """
+        csv_path     : master OHLCV CSV (the source of truth)
+        mmap         : keep a per-column .npy mirror of the CSV next to it and
+                       memory-map it, so workers share pages instead of parsing
+                       the CSV into private memory
+        columns_dir  : location of that mirror (default: <csv_path>.columns)
+        symbols_path : NSE symbol master used to validate tickers locally; if the
+                       file is missing any input is accepted and suffixed with .NS
+        intraday_dir : root of the month-chunked 1m/5m bar store
+        """
         self.csv_path = csv_path
+        self.mmap = mmap
+        self.columns_dir = columns_dir or csv_path + ".columns"
+        self.resolver = load_resolver(symbols_path)
+        # timeframe -> aggregated bars, built on first use and updated incrementally
+        self.aggregates = {}
+        # (Ticker, Date) of rows this agent merged in; they may not be on disk yet
+        self.added = []
+        self.intraday = IntradayStore(intraday_dir)
+
         if os.path.exists(csv_path):
-            self.data = pd.read_csv(csv_path, parse_dates=["Date"])
+            self.data = load_columns(self.columns_dir, csv_path) if mmap else None
+            if self.data is None:
+                self.data = compact_frame(pd.read_csv(csv_path))
+                if mmap:
+                    save_columns(self.data, self.columns_dir, csv_path)
+                    self.data = load_columns(self.columns_dir, csv_path)
         else:
             print("CSV not found. Creating empty dataset.")
-            self.data = pd.DataFrame(columns=["Date","Ticker","Open","High","Low","Close","Volume"])
+            self.data = compact_frame(pd.DataFrame(columns=COLUMNS))
 
-    # Normalize user-input ticker
+    # Normalize user-input ticker (raises ValueError for unknown symbols when a symbol master is loaded)
     def normalize_ticker(self, user_input):
+        # Yahoo index symbols (e.g. ^NSEI for NIFTY 50) are used as-is
+        if user_input.strip().startswith("^"):
+            return user_input.strip().upper()
+        if self.resolver is not None:
+            return self.resolver.resolve(user_input)
         s = user_input.strip().upper()
         if s in INDIAN_TICKER_MAP:
             return INDIAN_TICKER_MAP[s]
         return s if s.endswith(".NS") else s + ".NS"
 
-    # Fetch data from Yahoo Finance
+    # Fetch data from Yahoo Finance (rate-limited, retried; raises FetchError)
     def _fetch_from_yahoo(self, ticker, start_date, end_date):
         print(f"Fetching {ticker} from Yahoo Finance...")
-        try:
-            df = yf.download(ticker, start=start_date, end=end_date)
-            if df.empty:
-                print("Yahoo returned empty.")
-                return pd.DataFrame()
-            df = df.reset_index()
-            df["Ticker"] = ticker
-            return df[["Date","Ticker","Open","High","Low","Close","Volume"]]
-        except Exception as e:
-            print("Yahoo error:", e)
-            return pd.DataFrame()
+        return get_fetcher().fetch(ticker, start=start_date, end=end_date)
+
+    # Latest stored daily bar on or before end_date (the as-of date of a snapshot)
+    def last_bar_date(self, ticker, end_date):
+        dates = self.data["Date"][self.data["Ticker"] == ticker]
+        dates = dates[dates <= pd.Timestamp(end_date)]
+        return dates.max() if len(dates) else None
+
+    # Weekly / monthly bars for every ticker
+    def get_aggregate(self, timeframe):
+        if timeframe not in self.aggregates:
+            agg_dir = os.path.join(self.columns_dir, timeframe)
+            agg = load_columns(agg_dir, self.csv_path) if self.mmap else None
+            if agg is None:
+                agg = resample_ohlcv(self.data, timeframe)
+                # A mirror must match the CSV; with rows still queued for the writer it would not
+                if self.mmap and not self.added:
+                    save_columns(agg, agg_dir, self.csv_path)
+            elif self.added:
+                # The mirror follows the CSV, which may not have our downloads yet
+                agg = update_aggregate(agg, self.data, pd.concat(self.added), timeframe)
+            self.aggregates[timeframe] = agg
+        return self.aggregates[timeframe]
+
+    # Re-aggregate only the periods touched by newly added daily bars (the writer updates the mirrors)
+    def _update_aggregates(self, new_rows):
+        self.added.append(new_rows[["Date","Ticker"]])
+        for timeframe, agg in self.aggregates.items():
+            self.aggregates[timeframe] = update_aggregate(agg, self.data, new_rows, timeframe)
 
     # Main: load CSV + fallback
-    def get_data(self, user_ticker, start_date, end_date):
+    def get_data(self, user_ticker, start_date, end_date, timeframe="daily"):
+        """
+        Daily bars for [start_date, end_date], downloading missing history first.
+        timeframe="weekly"/"monthly" returns the precomputed aggregate bars instead.
+        Prices come back as float64 rupees.
+        """
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"Unknown timeframe '{timeframe}'. Use one of {list(TIMEFRAMES)}.")
         ticker = self.normalize_ticker(user_ticker)
         start_date = pd.Timestamp(start_date)
         end_date = pd.Timestamp(end_date)
 
-        df = self.data.copy()
-        df["Date"] = pd.to_datetime(df["Date"], errors="coerce").dropna()
-
-        df_ticker = df[df["Ticker"] == ticker]
+        # Dates are already datetime64 in the compact layout; no per-call copy or parse
+        df_ticker = self.data[self.data["Ticker"] == ticker]
 
         need_download = False
         fetch_start = start_date
@@ -97,28 +497,66 @@ class DataAgent:
                 fetch_start = min(start_date, csv_min)
                 fetch_end   = max(end_date, csv_max)
 
+        tracing.cache("data", hit=not need_download)
+
         if need_download:
-            yahoo_df = self._fetch_from_yahoo(ticker, fetch_start, fetch_end)
-            if not yahoo_df.empty:
-                df = pd.concat([df, yahoo_df], ignore_index=True)
+            # Concurrent sessions missing the same ticker share one download, which stays
+            # shared until the single writer for this CSV has persisted it
+            writer = get_writer(self.csv_path, self.columns_dir if self.mmap else None)
+            try:
+                yahoo_df, _ = fetch_shared(self._fetch_from_yahoo, ticker, fetch_start, fetch_end,
+                                           persist=writer.submit)
+            except NoDataError as e:
+                print(e)
+                yahoo_df = None
+            except FetchError as e:
+                # Upstream trouble: serve what is stored, or surface the typed error
+                if df_ticker.empty:
+                    raise
+                print(f"Yahoo unavailable ({type(e).__name__}: {e}); using stored data for {ticker}.")
+                yahoo_df = None
+            if yahoo_df is not None and not yahoo_df.empty:
+                new_rows = compact_frame(yahoo_df)
+                df = pd.concat([self.data.astype({"Ticker": str}),
+                                new_rows.astype({"Ticker": str})], ignore_index=True)
                 df = df.drop_duplicates(["Date","Ticker"])
-                df = df.sort_values(["Ticker","Date"])
-                df.to_csv(self.csv_path, index=False)
+                df = compact_frame(df, paise=True)
                 self.data = df
+                df_ticker = df[df["Ticker"] == ticker]
+                self._update_aggregates(new_rows)
 
-        df_final = df[(df["Ticker"] == ticker) &
-                      (df["Date"] >= start_date) &
-                      (df["Date"] <= end_date)]
-
-        if df_final.empty:
-            raise ValueError(f"No data found for {ticker} after fallback.")
+        if timeframe != "daily":
+            agg = self.get_aggregate(timeframe)
+            df_ticker = agg[agg["Ticker"] == ticker]
 
-        return df_final.reset_index(drop=True)
+        df_final = df_ticker[(df_ticker["Date"] >= start_date) &
+                             (df_ticker["Date"] <= end_date)]
 
-    # Indicators
-    def compute_indicators(self, df):
-
-        delta = df["Close"].diff()
+        if df_final.empty:
+            raise NoDataError(f"No data found for {ticker} after fallback.")
+
+        return to_rupees(df_final.reset_index(drop=True))
+
+    # Indicators (windows are in bars of the given timeframe)
+    def compute_indicators(self, df, timeframe="daily", state=None):
+        """
+        Add RSI, MACD/Signal and Bollinger Bands to df.
+        Pass the same IndicatorState for consecutive chunks of one series to
+        compute chunk-wise; results match a single pass over the whole series.
+        """
+        # Daily bars are aggregated first when a coarser timeframe is requested
+        if timeframe != "daily":
+            df = resample_ohlcv(df, timeframe)
+
+        # Do the maths in float64 whatever the input dtype
+        close = df["Close"].astype("float64").reset_index(drop=True)
+
+        # Rolling windows see the previous chunk's last closes, then that prefix is dropped
+        prev = state.tail if state is not None and state.tail is not None else close.iloc[:0]
+        history = pd.concat([prev, close], ignore_index=True)
+        n_prev = len(prev)
+
+        delta = history.diff()
         gain = delta.clip(lower=0)
         loss = -delta.clip(upper=0)
 
@@ -126,22 +564,63 @@ class DataAgent:
         avg_loss = loss.rolling(14).mean()
         rs = avg_gain / avg_loss
 
-        df["RSI"] = 100 - (100 / (1 + rs))
+        df["RSI"] = (100 - (100 / (1 + rs))).iloc[n_prev:].to_numpy()
 
-        ema12 = df["Close"].ewm(span=12, adjust=False).mean()
-        ema26 = df["Close"].ewm(span=26, adjust=False).mean()
+        ema12 = _ewm(close, 12, state.ema12 if state else None)
+        ema26 = _ewm(close, 26, state.ema26 if state else None)
 
-        df["MACD"] = ema12 - ema26
-        df["Signal"] = df["MACD"].ewm(span=9, adjust=False).mean()
+        macd = ema12 - ema26
+        signal = _ewm(macd, 9, state.signal if state else None)
+        df["MACD"] = macd.to_numpy()
+        df["Signal"] = signal.to_numpy()
 
-        sma20 = df["Close"].rolling(20).mean()
-        std20 = df["Close"].rolling(20).std()
+        sma20 = history.rolling(20).mean().iloc[n_prev:]
+        std20 = history.rolling(20).std().iloc[n_prev:]
 
-        df["BB_upper"] = sma20 + 2 * std20
-        df["BB_lower"] = sma20 - 2 * std20
+        df["BB_upper"] = (sma20 + 2 * std20).to_numpy()
+        df["BB_lower"] = (sma20 - 2 * std20).to_numpy()
+
+        if state is not None and len(close):
+            state.tail = history.tail(IndicatorState.TAIL).reset_index(drop=True)
+            state.ema12 = float(ema12.iloc[-1])
+            state.ema26 = float(ema26.iloc[-1])
+            state.signal = float(signal.iloc[-1])
 
         return df
 
+    # --------------------------------------------------------
+    # Intraday (1m / 5m) bars, stored and read in month chunks
+    # --------------------------------------------------------
+    def update_intraday(self, user_ticker, interval="5m"):
+        """Download the most recent intraday bars Yahoo serves and merge them into the store."""
+        ticker = self.normalize_ticker(user_ticker)
+        period = {"1m": "7d", "5m": "60d"}[interval]
+        print(f"Fetching {interval} bars for {ticker} from Yahoo Finance...")
+        try:
+            df = get_fetcher().fetch(ticker, period=period, interval=interval)
+        except NoDataError as e:
+            print(e)
+            return 0
+        # Store exchange-local wall-clock time without a timezone, like the daily bars
+        if df["Date"].dt.tz is not None:
+            df["Date"] = df["Date"].dt.tz_convert("Asia/Kolkata").dt.tz_localize(None)
+        self.intraday.append(ticker, interval, df[["Date","Open","High","Low","Close","Volume"]])
+        return len(df)
+
+    def iter_intraday(self, user_ticker, start_date, end_date, interval="5m", indicators=False):
+        """
+        Stream intraday bars for [start_date, end_date] one month chunk at a time.
+        With indicators=True every chunk carries RSI/MACD/Bollinger columns,
+        computed with window state carried over from the previous chunk.
+        """
+        ticker = self.normalize_ticker(user_ticker)
+        state = IndicatorState() if indicators else None
+        for chunk in self.intraday.iter_chunks(ticker, interval, start_date, end_date):
+            if indicators:
+                chunk = self.compute_indicators(chunk, state=state)
+            tracing.count("rows", len(chunk))
+            yield chunk
+
     # Summary
     def get_indicator_summary(self, df):
         latest = df.iloc[-1]
@@ -4,12 +4,24 @@ from datetime import datetime
 from textblob import TextBlob
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import pandas as pd
+import tracing
+import replay
 
 analyzer = SentimentIntensityAnalyzer()
 
+# Free RSS sources, queried in this order. {ticker} is filled in per request.
+RSS_SOURCES = {
+    "google": "https://news.google.com/rss/search?q={ticker}+stock&hl=en-US&gl=US&ceid=US:en",
+    "yahoo": "https://finance.yahoo.com/rss/headline?s={ticker}",
+    "bing": "https://www.bing.com/news/search?q={ticker}+stock&format=rss",
+    "seeking_alpha": "https://seekingalpha.com/api/sa/combined/{ticker}.xml",
+}
+
 class NewsAgent:
-    def __init__(self, ticker: str):
+    def __init__(self, ticker: str, sources=None):
         self.ticker = ticker
+        # name -> URL template; override to point at mirrors or local stub feeds
+        self.sources = sources if sources is not None else RSS_SOURCES
 
     def fetch_news(self, start_date: str, end_date: str):
         """
@@ -22,21 +34,9 @@ class NewsAgent:
 
         articles = []
 
-        # --- 1️ Google News RSS ---
-        google_rss = f"https://news.google.com/rss/search?q={self.ticker}+stock&hl=en-US&gl=US&ceid=US:en"
-        articles.extend(self._parse_rss(google_rss, start_ts, end_ts))
-
-        # --- 2️ Yahoo Finance RSS ---
-        yahoo_rss = f"https://finance.yahoo.com/rss/headline?s={self.ticker}"
-        articles.extend(self._parse_rss(yahoo_rss, start_ts, end_ts))
-
-        # --- 3️ Bing News RSS ---
-        bing_rss = f"https://www.bing.com/news/search?q={self.ticker}+stock&format=rss"
-        articles.extend(self._parse_rss(bing_rss, start_ts, end_ts))
-
-        # --- 4️ Seeking Alpha RSS ---
-        seeking_alpha_rss = f"https://seekingalpha.com/api/sa/combined/{self.ticker}.xml"
-        articles.extend(self._parse_rss(seeking_alpha_rss, start_ts, end_ts))
+        for source, url_template in self.sources.items():
+            rss_url = url_template.format(ticker=self.ticker)
+            articles.extend(self._parse_rss(rss_url, start_ts, end_ts))
 
         # Remove duplicate titles
         unique_articles = {a["title"]: a for a in articles}.values()
@@ -69,7 +69,9 @@ class NewsAgent:
     # ------------------ Helper Methods ------------------
     def _parse_rss(self, rss_url, start_ts, end_ts):
         """Parse RSS feed and return articles with sentiment."""
-        feed = feedparser.parse(rss_url)
+        with tracing.external_call("rss"):
+            # a record/replay session captures or supplies the raw feed body
+            feed = feedparser.parse(replay.rss_source(rss_url))
         articles = []
         for entry in feed.entries:
             published_dt = None
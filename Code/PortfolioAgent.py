@@ -0,0 +1,191 @@
+# portfolio_agent.py
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+TRADING_DAYS = 252
+
+
+class PortfolioAgent:
+    """
+    The Portfolio Agent receives:
+    - A DataAgent (price store)
+    - A list of tickers and a date range
+
+    And produces:
+    - Aligned daily returns
+    - Rolling correlation matrices and per-window volatilities
+    - Annualised volatility and beta against NIFTY
+    - Minimum-variance portfolio weights
+
+    Rolling matrices are computed for blocks of windows at once with batched
+    matrix products over a sliding-window view, not one pandas call per window.
+    The rolling stack is kept as float32 and correlation overwrites covariance
+    in place, so a run holds one [n_windows, N, N] array (~190 MiB for 200
+    tickers x 5 years). Use iter_rolling_covariance to stream blocks instead,
+    or run(..., history=False) for the latest window only.
+    """
+
+    def __init__(self, data_agent, window=60, benchmark="^NSEI", min_coverage=0.9):
+        self.data_agent = data_agent
+        self.window = window
+        self.benchmark = benchmark
+        # tickers with fewer than this share of the common trading days are dropped
+        self.min_coverage = min_coverage
+
+    # --------------------------------------------------------
+    # 1. Aligned returns
+    # --------------------------------------------------------
+    def load_returns(self, tickers, start_date, end_date):
+        """Return (returns DataFrame [dates x tickers], dropped {ticker: reason})."""
+        closes, dropped = {}, {}
+        for user_ticker in tickers:
+            try:
+                df = self.data_agent.get_data(user_ticker, start_date, end_date)
+                closes[df["Ticker"].iloc[0]] = df.set_index("Date")["Close"].astype("float64")
+            except Exception as e:
+                dropped[user_ticker] = str(e)
+
+        prices = pd.DataFrame(closes).sort_index()
+        coverage = prices.notna().mean()
+        for ticker in coverage[coverage < self.min_coverage].index:
+            dropped[ticker] = f"only {coverage[ticker]:.0%} of trading days available"
+        prices = prices.loc[:, coverage >= self.min_coverage]
+
+        # short gaps (suspensions, missing rows) are carried forward, then align on common dates
+        returns = prices.ffill(limit=5).pct_change(fill_method=None).dropna()
+        return returns, dropped
+
+    def load_benchmark_returns(self, start_date, end_date):
+        try:
+            df = self.data_agent.get_data(self.benchmark, start_date, end_date)
+        except Exception as e:
+            print(f"Benchmark {self.benchmark} unavailable: {e}")
+            return None
+        close = df.set_index("Date")["Close"].astype("float64")
+        return close.pct_change(fill_method=None).dropna()
+
+    # --------------------------------------------------------
+    # 2. Rolling covariance / correlation (batched)
+    # --------------------------------------------------------
+    def _windows(self, returns):
+        values = returns.to_numpy(dtype="float64")
+        n_obs = len(values)
+        if n_obs < self.window:
+            raise ValueError(f"Need at least {self.window} aligned observations, got {n_obs}.")
+        # shape [n_windows, N, w]: a view, no data is copied here
+        return sliding_window_view(values, self.window, axis=0)
+
+    def iter_rolling_covariance(self, returns, block=128):
+        """Yield (end dates, float64 covariance array [b, N, N]) for successive blocks of windows."""
+        windows = self._windows(returns)
+        w = self.window
+        for b in range(0, windows.shape[0], block):
+            x = windows[b:b + block]
+            x = x - x.mean(axis=2, keepdims=True)
+            yield returns.index[w - 1 + b:w - 1 + b + len(x)], np.matmul(x, x.transpose(0, 2, 1)) / (w - 1)
+
+    def rolling_covariance(self, returns, block=128, dtype="float32"):
+        """
+        Covariance matrix of every `window`-day window, computed in float64 and
+        stored as dtype. Returns (end dates of the windows, array [n_windows, N, N]).
+        """
+        n_windows, n_assets = len(returns) - self.window + 1, returns.shape[1]
+        out = np.empty((max(n_windows, 0), n_assets, n_assets), dtype=dtype)
+        i = 0
+        for _, cov in self.iter_rolling_covariance(returns, block):
+            out[i:i + len(cov)] = cov
+            i += len(cov)
+        return returns.index[self.window - 1:], out
+
+    def rolling_correlation(self, cov, inplace=False):
+        """Correlation matrices from covariance ones; inplace=True reuses cov's memory."""
+        std = np.sqrt(np.einsum("tii->ti", cov))
+        out = cov if inplace else cov.copy()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out /= std[:, :, None]
+            out /= std[:, None, :]
+        return out
+
+    # --------------------------------------------------------
+    # 3. Volatility and beta
+    # --------------------------------------------------------
+    def volatility(self, returns):
+        """Annualised volatility over the full range and over the latest window."""
+        return pd.DataFrame({
+            "volatility": returns.std() * np.sqrt(TRADING_DAYS),
+            "volatility_latest": returns.tail(self.window).std() * np.sqrt(TRADING_DAYS),
+        })
+
+    def beta(self, returns, benchmark_returns):
+        """Beta of each ticker against the benchmark over the common dates."""
+        joined = returns.join(benchmark_returns.rename("__benchmark__"), how="inner")
+        if len(joined) < 2:
+            return None
+        x = joined.to_numpy(dtype="float64")
+        x = x - x.mean(axis=0)
+        market = x[:, -1]
+        betas = (x[:, :-1].T @ market) / (market @ market)
+        return pd.Series(betas, index=returns.columns, name="beta")
+
+    # --------------------------------------------------------
+    # 4. Minimum-variance weights
+    # --------------------------------------------------------
+    def min_variance_weights(self, cov, shrinkage=1e-4):
+        """
+        Fully-invested (weights sum to 1) minimum-variance portfolio, shorting allowed:
+        w = inv(S) 1 / (1' inv(S) 1). A small ridge keeps S invertible when
+        tickers are nearly collinear or there are fewer days than tickers.
+        """
+        n = cov.shape[0]
+        ridge = shrinkage * np.trace(cov) / n
+        x = np.linalg.solve(cov + ridge * np.eye(n), np.ones(n))
+        return x / x.sum()
+
+    # --------------------------------------------------------
+    # 5. Master function: produces portfolio analysis
+    # --------------------------------------------------------
+    def run(self, tickers, start_date, end_date, history=True):
+        """
+        history=True adds the rolling stacks: rolling_correlation [n_windows, N, N]
+        and rolling_volatility [n_windows, N] (daily std), both float32; the
+        covariance of window t is corr[t] * outer(std[t], std[t]).
+        history=False only computes the latest window.
+        """
+        returns, dropped = self.load_returns(tickers, start_date, end_date)
+        if returns.shape[1] < 2:
+            raise ValueError("Need at least two tickers with overlapping history.")
+        names = list(returns.columns)
+        if len(returns) < self.window:
+            raise ValueError(f"Need at least {self.window} aligned observations, got {len(returns)}.")
+
+        dates, rolling_std, rolling_corr = None, None, None
+        if history:
+            dates, rolling_corr = self.rolling_covariance(returns)
+            rolling_std = np.sqrt(np.einsum("tii->ti", rolling_corr))
+            rolling_corr = self.rolling_correlation(rolling_corr, inplace=True)
+
+        latest_cov = returns.tail(self.window).cov().to_numpy()
+        latest_corr = self.rolling_correlation(latest_cov[None])[0]
+
+        full_cov = returns.cov().to_numpy()
+        weights = self.min_variance_weights(full_cov)
+
+        benchmark_returns = self.load_benchmark_returns(start_date, end_date)
+        beta = self.beta(returns, benchmark_returns) if benchmark_returns is not None else None
+
+        return {
+            "tickers": names,
+            "dropped": dropped,
+            "observations": len(returns),
+            "window": self.window,
+            "window_end_dates": dates,
+            "rolling_volatility": rolling_std,
+            "rolling_correlation": rolling_corr,
+            "latest_covariance": pd.DataFrame(latest_cov, index=names, columns=names),
+            "latest_correlation": pd.DataFrame(latest_corr, index=names, columns=names),
+            "volatility": self.volatility(returns),
+            "beta": beta,
+            "min_variance_weights": pd.Series(weights, index=names, name="weight"),
+        }
@@ -1,4 +1,5 @@
 # reportagent.py
+import io
 import os
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
@@ -6,27 +7,36 @@ from reportlab.pdfgen import canvas
 from reportlab.platypus import Image, Spacer, SimpleDocTemplate, Paragraph
 from reportlab.lib.styles import getSampleStyleSheet
 from datetime import datetime
+from PIL import Image as PILImage
+
+# Embedded charts are downsampled to this resolution for the 6.5-inch frame
+CHART_DPI = 150
+CHART_JPEG_QUALITY = 85
 
 class ReportAgent:
     def __init__(self, output_dir="reports"):
         self.output_dir = output_dir
         os.makedirs(self.output_dir, exist_ok=True)
 
-    def generate_report(self, analysis, filename=None):
+    def generate_report(self, analysis, filename=None, in_memory=False):
         """
         Generate PDF report including:
         - Technical indicators
         - Sentiment analysis
         - LLM summary
         - Charts
+
+        Returns the file path, or the PDF bytes when in_memory=True
+        (nothing is written to output_dir in that case).
         """
         if filename is None:
             filename = f"{analysis['ticker']}_report_{datetime.now().strftime('%Y%m%d')}.pdf"
 
         filepath = os.path.join(self.output_dir, filename)
+        target = io.BytesIO() if in_memory else filepath
 
         # Use SimpleDocTemplate for easier text wrapping
-        doc = SimpleDocTemplate(filepath, pagesize=letter,
+        doc = SimpleDocTemplate(target, pagesize=letter,
                                 rightMargin=50, leftMargin=50,
                                 topMargin=50, bottomMargin=50)
         story = []
@@ -65,36 +75,45 @@ class ReportAgent:
         story.append(Spacer(1, 24))
 
         # Charts
-        for chart in analysis.get("charts", []):
+        charts = analysis.get("charts", [])
+        if isinstance(charts, dict):
+            # FinancialWorkflow passes VisualizationAgent's output dict as-is
+            charts = charts.values()
+        for chart in charts:
             # chart can be a dict or string depending on your VisualizationAgent
-            if isinstance(chart, dict):
-                # If indicators chart dict
-                for key, path in chart.items():
-                    if os.path.exists(path):
-                        try:
-                            img = Image(path)
-                            max_width = 6.5 * inch
-                            aspect = img.imageHeight / img.imageWidth
-                            img.drawWidth = max_width
-                            img.drawHeight = max_width * aspect
-                            story.append(img)
-                            story.append(Spacer(1, 12))
-                        except Exception as e:
-                            print(f"Error adding chart {path}: {e}")
-            else:
-                # Single chart path
-                if os.path.exists(chart):
+            paths = chart.values() if isinstance(chart, dict) else [chart]
+            for path in paths:
+                if os.path.exists(path):
                     try:
-                        img = Image(chart)
-                        max_width = 6.5 * inch
-                        aspect = img.imageHeight / img.imageWidth
-                        img.drawWidth = max_width
-                        img.drawHeight = max_width * aspect
-                        story.append(img)
+                        story.append(self._load_chart(path))
                         story.append(Spacer(1, 12))
                     except Exception as e:
-                        print(f"Error adding chart {chart}: {e}")
+                        print(f"Error adding chart {path}: {e}")
 
         # Build PDF
         doc.build(story)
+        if in_memory:
+            return target.getvalue()
         return filepath
+
+    # ------------------ Helper Methods ------------------
+    def _load_chart(self, path):
+        """
+        Decode a chart image once, downscale it to the 6.5-inch frame at
+        CHART_DPI and re-encode it as JPEG before embedding.
+        """
+        max_width = 6.5 * inch
+        with PILImage.open(path) as src:
+            img = src.convert("RGB")
+
+        target_px = int(6.5 * CHART_DPI)
+        if img.width > target_px:
+            height_px = round(img.height * target_px / img.width)
+            img = img.resize((target_px, height_px), PILImage.LANCZOS)
+
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=CHART_JPEG_QUALITY, optimize=True)
+        buf.seek(0)
+
+        aspect = img.height / img.width
+        return Image(buf, width=max_width, height=max_width * aspect)
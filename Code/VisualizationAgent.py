@@ -4,13 +4,29 @@ import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import pandas as pd
 import numpy as np
+import threading
+
+# pyplot keeps global figure state, so chart generation is serialised across threads
+_PLOT_LOCK = threading.Lock()
 
 class VisualizationAgent:
-    def __init__(self,ticker, output_dir="charts"):
+    def __init__(self,ticker, output_dir="charts", timeframe="daily"):
         self.output_dir = output_dir
         self.ticker=ticker
+        # Bar timeframe of the frames passed in; used in titles and file names
+        self.timeframe = timeframe
         os.makedirs(self.output_dir, exist_ok=True)
 
+    def _path(self, filename):
+        # Daily charts keep their original names; other timeframes get a suffix
+        if self.timeframe != "daily":
+            stem, ext = os.path.splitext(filename)
+            filename = f"{stem}_{self.timeframe}{ext}"
+        return os.path.join(self.output_dir, filename)
+
+    def _title(self, title):
+        return title if self.timeframe == "daily" else f"{title} [{self.timeframe.capitalize()}]"
+
     def plot_price_signals(self, df, analysis):
         """
         Price chart with BUY/HOLD/SELL signals
@@ -23,13 +39,13 @@ class VisualizationAgent:
         color = {'BUY':'green', 'SELL':'red', 'HOLD':'orange'}.get(signal, 'gray')
         plt.scatter(df['Date'].iloc[-1], df['Close'].iloc[-1], color=color, s=100, label=f'Signal: {signal}')
 
-        plt.title(f"{analysis['ticker']} Price with Signal ({analysis['trend']})")
+        plt.title(self._title(f"{analysis['ticker']} Price with Signal ({analysis['trend']})"))
         plt.xlabel("Date")
         plt.ylabel("Price")
         plt.legend()
         plt.grid(True)
 
-        path = os.path.join(self.output_dir, f"{analysis['ticker']}_price_signal.png")
+        path = self._path(f"{analysis['ticker']}_price_signal.png")
         plt.savefig(path)
         plt.close()
         return path
@@ -44,12 +60,12 @@ class VisualizationAgent:
         plt.figure(figsize=(12,4))
         plt.plot(df['Date'], df['MACD'], label='MACD', color='blue')
         plt.plot(df['Date'], df['Signal'], label='Signal', color='red')
-        plt.title("MACD Indicator")
+        plt.title(self._title("MACD Indicator"))
         plt.xlabel("Date")
         plt.ylabel("MACD")
         plt.legend()
         plt.grid(True)
-        macd_path = os.path.join(self.output_dir, "MACD.png")
+        macd_path = self._path("MACD.png")
         plt.savefig(macd_path)
         plt.close()
         paths['MACD'] = macd_path
@@ -59,12 +75,12 @@ class VisualizationAgent:
         plt.plot(df['Date'], df['RSI'], label='RSI', color='purple')
         plt.axhline(70, color='red', linestyle='--', label='Overbought')
         plt.axhline(30, color='green', linestyle='--', label='Oversold')
-        plt.title("RSI Indicator")
+        plt.title(self._title("RSI Indicator"))
         plt.xlabel("Date")
         plt.ylabel("RSI")
         plt.legend()
         plt.grid(True)
-        rsi_path = os.path.join(self.output_dir, "RSI.png")
+        rsi_path = self._path("RSI.png")
         plt.savefig(rsi_path)
         plt.close()
         paths['RSI'] = rsi_path
@@ -74,12 +90,12 @@ class VisualizationAgent:
         plt.plot(df['Date'], df['Close'], label='Close', color='blue')
         plt.plot(df['Date'], df['BB_upper'], label='Upper Band', color='red', linestyle='--')
         plt.plot(df['Date'], df['BB_lower'], label='Lower Band', color='green', linestyle='--')
-        plt.title("Bollinger Bands")
+        plt.title(self._title("Bollinger Bands"))
         plt.xlabel("Date")
         plt.ylabel("Price")
         plt.legend()
         plt.grid(True)
-        bb_path = os.path.join(self.output_dir, "BollingerBands.png")
+        bb_path = self._path("BollingerBands.png")
         plt.savefig(bb_path)
         plt.close()
         paths['BollingerBands'] = bb_path
@@ -106,13 +122,13 @@ class VisualizationAgent:
 
         plt.figure(figsize=(12,6))
         plt.plot(df['Date'], capital_over_time, label='Simulated Capital', color='green')
-        plt.title(f"{analysis['ticker']} Capital Growth Simulation")
+        plt.title(self._title(f"{analysis['ticker']} Capital Growth Simulation"))
         plt.xlabel("Date")
         plt.ylabel("Capital ($)")
         plt.grid(True)
         plt.legend()
 
-        path = os.path.join(self.output_dir, f"{analysis['ticker']}_profit_simulation.png")
+        path = self._path(f"{analysis['ticker']}_profit_simulation.png")
         plt.savefig(path)
         plt.close()
         return path
@@ -126,7 +142,7 @@ class VisualizationAgent:
         plt.bar(['Sentiment'], [sentiment_score], color='blue')
         plt.ylim(-1,1)
         plt.title("Average News Sentiment")
-        path = os.path.join(self.output_dir, "news_sentiment.png")
+        path = self._path("news_sentiment.png")
         plt.savefig(path)
         plt.close()
         return path
@@ -136,9 +152,10 @@ class VisualizationAgent:
         Generate all charts and return paths
         """
         chart_paths = {}
-        chart_paths['price_signal'] = self.plot_price_signals(df, analysis)
-        chart_paths['indicators'] = self.plot_indicators(df)
-        chart_paths['profit'] = self.plot_profit_simulation(df, analysis)
-        if sentiment_summary:
-            chart_paths['sentiment'] = self.plot_sentiment(sentiment_summary)
+        with _PLOT_LOCK:
+            chart_paths['price_signal'] = self.plot_price_signals(df, analysis)
+            chart_paths['indicators'] = self.plot_indicators(df)
+            chart_paths['profit'] = self.plot_profit_simulation(df, analysis)
+            if sentiment_summary:
+                chart_paths['sentiment'] = self.plot_sentiment(sentiment_summary)
         return chart_paths
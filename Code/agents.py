@@ -10,6 +10,9 @@ from AnalysisAgent import AnalysisAgent
 from NewsAgent import NewsAgent
 from VisualizationAgent import VisualizationAgent
 from ReportAgent import ReportAgent
+from snapshots import SnapshotStore
+import tracing
+from replay import current as current_replay, session as replay_session
 
 # ===========================
 # 1. LLM (Groq) Configuration
@@ -20,15 +23,26 @@ os.environ["GROQ_MODEL"]
 client = Groq(api_key=os.environ["GROQ_API_KEY"])
 model_name=os.environ.get("GROQ_MODEL")
 
+if os.environ.get("METRICS_PORT"):
+    tracing.serve_metrics(os.environ["METRICS_PORT"])
+
 def llm(prompt: str):
-    response = client.chat.completions.create(
-        model=model_name,
-        messages=[
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.2
-    )
-    return response.choices[0].message.content
+    session = current_replay()
+    if session is not None and session.replaying:
+        return session.llm_response(prompt)
+
+    with tracing.external_call("groq"):
+        response = client.chat.completions.create(
+            model=model_name,
+            messages=[
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.2
+        )
+    content = response.choices[0].message.content
+    if session is not None:
+        session.record_llm(prompt, content)
+    return content
 
 '''financial_brain = Agent(
     name="financial_orchestrator",
@@ -51,62 +65,112 @@ def llm(prompt: str):
 # ============================================
 class FinancialWorkflow(Workflow):
 
-    def run(self, ticker: str, start_date: str, end_date: str):
+    def run(self, ticker: str, start_date: str, end_date: str, in_memory: bool = False,
+            timeframe: str = "daily", charts_dir: str = "charts", record: str = None,
+            replay: str = None, profile: str = None,
+            csv_path: str = "master_investment_dataset.csv"):
+        """
+        record   : bundle path; save prices, feed bodies and the LLM answer of this run
+        replay   : bundle path; take those inputs from a recorded bundle instead (offline)
+        profile  : directory for per-stage cProfile dumps (default: TRACE_PROFILE)
+        csv_path : master OHLCV CSV the data step reads and extends
+        """
 
         print(f"\nStarting financial analysis workflow for {ticker}")
 
-        # ---- STEP 1: Load CSV + Filter ----
-        print("\n STEP 1 — Loading Data...")
-        data_agent = DataAgent("master_investment_dataset.csv")
-        df = data_agent.get_data(ticker, start_date, end_date)
-        df = data_agent.compute_indicators(df)
-        indicator_summary = data_agent.get_indicator_summary(df)
-
-        # ---- STEP 2: Technical Analysis ----
-        print("\n STEP 2 — Running Technical Analysis...")
-        analysis_agent = AnalysisAgent(ticker)
-        analysis_output = analysis_agent.run(df, indicator_summary)
-
-        # ---- STEP 3: News + Sentiment ----
-        print("\n STEP 3 — News Sentiment...")
-        news_agent = NewsAgent(ticker)
-        articles = news_agent.fetch_news(start_date, end_date)
-        news_summary = news_agent.summarize_sentiment(articles)
-
-        # ---- STEP 4: Visualization ----
-        print("\n STEP 4 — Generating Charts...")
-        viz_agent = VisualizationAgent(ticker)
-        chart_paths = viz_agent(df, analysis_output, news_summary)
-
-        # ---- STEP 5: LLM Summary ----
-        print("\n STEP 5 — LLM Summary Generation...")
-        final_summary = self.generate_summary_llm(ticker, analysis_output, news_summary)
-
-        # ---- STEP 6: PDF Report ----
-        print("\n STEP 6 — Creating PDF Report...")
-        report_agent = ReportAgent()
-        payload = {
-            "ticker": ticker,
-            "start": start_date,
-            "end": end_date,
-            "technical": indicator_summary,
-            "trend": analysis_output["trend"],
-            "score": analysis_output["score"],
-            "final_signal": analysis_output["signal"],
-            "sentiment": news_summary,
-            "news_articles": articles,
-            "summary": final_summary,
-            "charts": chart_paths
-        }
-
-        pdf_path = report_agent.generate_report(payload)
-        print(f"\n Report saved at: {pdf_path}")
+        with replay_session(record=record, replay=replay, ticker=ticker, timeframe=timeframe,
+                            start=start_date, end=end_date) as session, \
+             tracing.Trace("financial_workflow", profile=profile, ticker=ticker, timeframe=timeframe,
+                           start=str(start_date), end=str(end_date)) as trace:
+
+            # ---- STEP 0: Precomputed snapshot (latest view, standard lookback) ----
+            data_agent = DataAgent(csv_path, mmap=True)
+            snapshot = None
+            # recorded and replayed runs always take the live data path
+            if timeframe == "daily" and session is None:
+                with trace.stage("snapshot"):
+                    normalized = data_agent.normalize_ticker(ticker)
+                    snapshot = SnapshotStore().get(normalized, start_date, end_date,
+                                                   as_of=data_agent.last_bar_date(normalized, end_date))
+                tracing.cache("snapshot", hit=snapshot is not None)
+
+            if snapshot is not None:
+                print("\n STEP 1-2 — Using nightly snapshot from", snapshot["computed_at"])
+                df = snapshot["df"]
+                indicator_summary = snapshot["indicators"]
+                analysis_output = snapshot["analysis"]
+            else:
+                # ---- STEP 1: Load CSV + Filter ----
+                print("\n STEP 1 — Loading Data...")
+                with trace.stage("data"):
+                    if session is not None and session.replaying:
+                        df = session.prices.copy()
+                    else:
+                        df = data_agent.get_data(ticker, start_date, end_date, timeframe=timeframe)
+                        if session is not None:
+                            session.record_prices(df)
+                    df = data_agent.compute_indicators(df)
+                    indicator_summary = data_agent.get_indicator_summary(df)
+
+                # ---- STEP 2: Technical Analysis ----
+                print("\n STEP 2 — Running Technical Analysis...")
+                with trace.stage("analysis"):
+                    analysis_agent = AnalysisAgent(ticker)
+                    analysis_output = analysis_agent.run(df, indicator_summary)
+            trace.count("rows", len(df))
+
+            # ---- STEP 3: News + Sentiment ----
+            print("\n STEP 3 — News Sentiment...")
+            with trace.stage("news"):
+                news_agent = NewsAgent(ticker)
+                articles = news_agent.fetch_news(start_date, end_date)
+                news_summary = news_agent.summarize_sentiment(articles)
+            trace.count("articles", len(articles))
+
+            # ---- STEP 4: Visualization ----
+            print("\n STEP 4 — Generating Charts...")
+            with trace.stage("visualization"):
+                viz_agent = VisualizationAgent(ticker, output_dir=charts_dir, timeframe=timeframe)
+                chart_paths = viz_agent(df, analysis_output, news_summary)
+
+            # ---- STEP 5: LLM Summary ----
+            print("\n STEP 5 — LLM Summary Generation...")
+            with trace.stage("llm"):
+                final_summary = self.generate_summary_llm(ticker, analysis_output, news_summary)
+
+            # ---- STEP 6: PDF Report ----
+            print("\n STEP 6 — Creating PDF Report...")
+            report_agent = ReportAgent()
+            payload = {
+                "ticker": ticker,
+                "start": start_date,
+                "end": end_date,
+                "technical": indicator_summary,
+                "trend": analysis_output["trend"],
+                "score": analysis_output["score"],
+                "final_signal": analysis_output["signal"],
+                "sentiment": news_summary,
+                "news_articles": articles,
+                "summary": final_summary,
+                "charts": chart_paths
+            }
+
+            pdf_path, pdf_bytes = None, None
+            with trace.stage("report"):
+                if in_memory:
+                    pdf_bytes = report_agent.generate_report(payload, in_memory=True)
+                    print(f"\n Report built in memory ({len(pdf_bytes)} bytes)")
+                else:
+                    pdf_path = report_agent.generate_report(payload)
+                    print(f"\n Report saved at: {pdf_path}")
 
         return {
             "pdf_path": pdf_path,
+            "pdf_bytes": pdf_bytes,
             "summary": final_summary,
             "articles": articles,
-            "charts": chart_paths
+            "charts": chart_paths,
+            "trace": trace.to_dict()
         }
 
 
@@ -135,9 +199,9 @@ class FinancialWorkflow(Workflow):
 # ===================================================
 # 3. Public function to run workflow from main app
 # ===================================================
-def run_financial_agents(ticker, start_date, end_date):
+def run_financial_agents(ticker, start_date, end_date, in_memory=False, timeframe="daily"):
     start_date = pd.Timestamp(start_date)
     end_date = pd.Timestamp(end_date)
     workflow = FinancialWorkflow()
-    result = workflow.run(ticker, start_date, end_date)
+    result = workflow.run(ticker, start_date, end_date, in_memory=in_memory, timeframe=timeframe)
     return result
@@ -1,7 +1,10 @@
 # app.py
 import pandas as pd
 import streamlit as st
+from datetime import date, timedelta
 from agents import run_financial_agents
+from snapshots import STANDARD_LOOKBACK_DAYS
+from symbols import load_resolver
 
 
 import streamlit as st
@@ -81,10 +84,29 @@ st.title("Multi-Agent Financial Analysis System")
 # 1️ Sidebar Inputs
 # ------------------------------
 st.sidebar.header("Input Parameters")
-ticker = st.sidebar.text_input("Stock Ticker", value="AAPL")
-
-start_date = st.sidebar.date_input("Start Date")
+ticker = st.sidebar.text_input("Stock Ticker", value="RELIANCE")
+
+# Autocomplete from the local NSE symbol master, if present
+resolver = load_resolver()
+if resolver is not None and ticker:
+    matches = resolver.complete(ticker) or [(s, n) for s, n, _ in resolver.fuzzy(ticker)]
+    names = dict(matches)
+    # What the input resolves to (e.g. the SBI alias -> SBIN) stays the default choice
+    try:
+        resolved = resolver.resolve(ticker).removesuffix(".NS")
+        names = {resolved: resolver.names.get(resolved, ticker.strip().upper()),
+                 **{s: n for s, n in names.items() if s != resolved}}
+    except ValueError:
+        pass
+    if names:
+        ticker = st.sidebar.selectbox("Matching symbols", list(names),
+                                      format_func=lambda s: f"{s} — {names[s]}")
+
+# Default window matches the nightly snapshots, so the common request is a keyed lookup
+start_date = st.sidebar.date_input("Start Date", value=date.today() - timedelta(days=STANDARD_LOOKBACK_DAYS))
 end_date = st.sidebar.date_input("End Date")
+# Weekly / monthly bars keep multi-year views to a few hundred rows
+timeframe = st.sidebar.selectbox("Timeframe", ["daily", "weekly", "monthly"])
 # ------------------------------
 # 2️ Run Analysis Button
 # ------------------------------
@@ -94,7 +116,8 @@ if st.sidebar.button("Run Analysis"):
         with st.spinner(f"Running financial analysis for {ticker}..."):
 
             try:
-                result= run_financial_agents(ticker, start_date, end_date)
+                result= run_financial_agents(ticker, start_date, end_date, in_memory=True,
+                                            timeframe=timeframe)
                 st.success(f"Analysis completed!")
 
                 st.subheader(f"Summary for {ticker} Stock from {start_date} to {end_date}")
@@ -110,12 +133,10 @@ if st.sidebar.button("Run Analysis"):
                 for path in flatten_chart_paths(charts):
                     st.image(path)
 
-                # Display PDF download link
-                with open(result["pdf_path"], "rb") as f:
-                    pdf_bytes = f.read()
+                # Display PDF download link (report is built in memory)
                 st.download_button(
                     label="Download PDF Report",
-                    data=pdf_bytes,
+                    data=result["pdf_bytes"],
                     file_name=f"{ticker}_financial_report.pdf",
                     mime="application/pdf",
                     key=f"{ticker}_pdf_download"
@@ -0,0 +1,251 @@
+# batch.py
+"""
+Nightly batch runner: produces a PDF report for every ticker in a watchlist.
+
+    python batch.py watchlist.txt --start 2024-01-01 --end 2025-03-31 --workers 4
+
+The watchlist is a plain text file with one ticker (or company alias) per line;
+blank lines and lines starting with '#' are ignored.
+
+Progress is checkpointed to a JSON file after every ticker, so re-running the
+same command after a crash only processes the tickers that have not finished.
+Without an explicit --start/--end, an unfinished checkpoint for the same
+watchlist is resumed with its original date window, even after midnight.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use("Agg")  # no display in batch runs
+
+import pandas as pd
+
+from DataAgent import DataAgent
+from AnalysisAgent import AnalysisAgent
+from NewsAgent import NewsAgent
+from ReportAgent import ReportAgent
+from VisualizationAgent import VisualizationAgent
+import tracing
+
+
+def read_watchlist(path):
+    tickers = []
+    with open(path) as f:
+        for line in f:
+            s = line.strip()
+            if s and not s.startswith("#"):
+                tickers.append(s)
+    # keep order, drop repeats
+    return list(dict.fromkeys(tickers))
+
+
+class Checkpoint:
+    """
+    JSON file recording finished and failed tickers for one batch run.
+    Writes go to a temp file first and are swapped in with os.replace, so a
+    crash mid-write never leaves a truncated checkpoint behind.
+    """
+
+    def __init__(self, path, params):
+        self.path = path
+        self.params = params
+        self.lock = threading.Lock()
+        self.state = {"params": params, "done": {}, "failed": {}}
+
+        if os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            if saved.get("params") == params:
+                self.state = saved
+                self.state["failed"] = {}  # failed tickers are retried on resume
+            else:
+                print("Checkpoint belongs to a different run. Starting fresh.")
+
+    @staticmethod
+    def unfinished_window(path, watchlist, tickers):
+        """(start, end) of a saved run of watchlist that has tickers left to do, else None."""
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            saved = json.load(f)
+        params = saved.get("params", {})
+        if params.get("watchlist") != watchlist:
+            return None
+        if all(t in saved.get("done", {}) for t in tickers):
+            return None
+        return params["start"], params["end"]
+
+    def is_done(self, ticker):
+        return ticker in self.state["done"]
+
+    def mark_done(self, ticker, result):
+        with self.lock:
+            self.state["done"][ticker] = result
+            self._save()
+
+    def mark_failed(self, ticker, error):
+        with self.lock:
+            self.state["failed"][ticker] = error
+            self._save()
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class BatchRunner:
+    """
+    Runs the data -> analysis -> news -> charts -> report stages for many
+    tickers on a bounded thread pool.
+
+    One DataAgent is shared by all workers so the master CSV is parsed once.
+    The data stage is serialised with a lock because DataAgent updates its
+    in-memory frame on a cache miss; VisualizationAgent serialises chart
+    drawing itself. News fetching and PDF building run in parallel.
+    """
+
+    def __init__(self, csv_path, start_date, end_date, workers=4,
+                 charts_dir="charts", reports_dir="reports"):
+        self.start_date = pd.Timestamp(start_date)
+        self.end_date = pd.Timestamp(end_date)
+        self.workers = workers
+        self.charts_dir = charts_dir
+        self.report_agent = ReportAgent(reports_dir)
+
+        self.data_agent = DataAgent(csv_path)
+        self.data_lock = threading.Lock()
+
+    def run_ticker(self, user_ticker):
+        ticker = self.data_agent.normalize_ticker(user_ticker)
+
+        with tracing.Trace("batch_ticker", ticker=ticker) as trace:
+
+            # ---- STEP 1: Data + indicators ----
+            with trace.stage("data"):
+                with self.data_lock:
+                    df = self.data_agent.get_data(ticker, self.start_date, self.end_date)
+                df = self.data_agent.compute_indicators(df)
+                technical_summary = self.data_agent.get_indicator_summary(df)
+            trace.count("rows", len(df))
+
+            # ---- STEP 2: Technical analysis ----
+            with trace.stage("analysis"):
+                analysis_output = AnalysisAgent(ticker).run(df, technical_summary)
+
+            # ---- STEP 3: News + sentiment ----
+            with trace.stage("news"):
+                news_agent = NewsAgent(ticker)
+                articles = news_agent.fetch_news(self.start_date, self.end_date)
+                sentiment_summary = news_agent.summarize_sentiment(articles)
+            trace.count("articles", len(articles))
+
+            # ---- STEP 4: Charts (one folder per ticker, file names are fixed) ----
+            viz_agent = VisualizationAgent(ticker, output_dir=os.path.join(self.charts_dir, ticker))
+            with trace.stage("visualization"):
+                chart_paths = viz_agent(df, analysis_output, sentiment_summary)
+
+            # ---- STEP 5: Report ----
+            final_analysis = {
+                "ticker": ticker,
+                "start": self.start_date.date(),
+                "end": self.end_date.date(),
+                "technical": technical_summary,
+                "sentiment": sentiment_summary,
+                "final_signal": analysis_output["signal"],
+                "summary": analysis_output["indicator_explanations"]["MACD"],
+                "charts": chart_paths,
+            }
+            with trace.stage("report"):
+                pdf_path = self.report_agent.generate_report(final_analysis)
+
+        return {
+            "ticker": ticker,
+            "signal": analysis_output["signal"],
+            "score": analysis_output["score"],
+            "rows": len(df),
+            "articles": len(articles),
+            "pdf_path": pdf_path,
+        }
+
+    def run(self, tickers, checkpoint):
+        pending = [t for t in tickers if not checkpoint.is_done(t)]
+        skipped = len(tickers) - len(pending)
+        if skipped:
+            print(f"Resuming: {skipped} of {len(tickers)} tickers already done.")
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.run_ticker, t): t for t in pending}
+            for future in as_completed(futures):
+                user_ticker = futures[future]
+                try:
+                    result = future.result()
+                    checkpoint.mark_done(user_ticker, result)
+                    print(f"[ok]   {user_ticker}: {result['signal']} -> {result['pdf_path']}")
+                except Exception as e:
+                    checkpoint.mark_failed(user_ticker, f"{type(e).__name__}: {e}")
+                    print(f"[fail] {user_ticker}: {e}")
+                    traceback.print_exc()
+        elapsed = time.perf_counter() - started
+
+        self.print_summary(pending, checkpoint, elapsed)
+
+    def print_summary(self, pending, checkpoint, elapsed):
+        failed = checkpoint.state["failed"]
+        processed = len(pending)
+        succeeded = processed - len(failed)
+
+        print("\n===== BATCH SUMMARY =====")
+        print(f"Processed : {processed} tickers in {elapsed:.1f}s")
+        if processed and elapsed > 0:
+            print(f"Throughput: {processed / elapsed * 60:.1f} tickers/min")
+        print(f"Succeeded : {succeeded}")
+        print(f"Failed    : {len(failed)}")
+        for ticker, error in failed.items():
+            print(f"  - {ticker}: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate reports for every ticker in a watchlist.")
+    parser.add_argument("watchlist", help="text file with one ticker per line")
+    parser.add_argument("--start", help="default: one year before --end")
+    parser.add_argument("--end", help="default: today (or the window of an unfinished checkpoint)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--csv", default="master_investment_dataset.csv")
+    parser.add_argument("--checkpoint", default="batch_checkpoint.json")
+    parser.add_argument("--charts-dir", default="charts")
+    parser.add_argument("--reports-dir", default="reports")
+    args = parser.parse_args()
+
+    tickers = read_watchlist(args.watchlist)
+    watchlist = os.path.abspath(args.watchlist)
+
+    # Pin the window of an interrupted run so a re-run after midnight still resumes it
+    window = None
+    if args.start is None and args.end is None:
+        window = Checkpoint.unfinished_window(args.checkpoint, watchlist, tickers)
+    if window is not None:
+        args.start, args.end = window
+        print(f"Resuming unfinished run for {args.start} -> {args.end}.")
+    else:
+        end = pd.Timestamp(args.end) if args.end else pd.Timestamp.today().normalize()
+        args.end = str(end.date())
+        args.start = args.start or str((end - pd.DateOffset(years=1)).date())
+
+    params = {"watchlist": watchlist, "start": args.start, "end": args.end}
+    checkpoint = Checkpoint(args.checkpoint, params)
+
+    runner = BatchRunner(args.csv, args.start, args.end, workers=args.workers,
+                         charts_dir=args.charts_dir, reports_dir=args.reports_dir)
+    runner.run(tickers, checkpoint)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+# benchmark.py
+"""
+Offline benchmark for the agent pipeline.
+
+    python benchmark.py --sizes 250,1250,5000 --tickers 20 --repeat 3
+
+Everything runs against synthetic inputs in a temporary workspace:
+- a master OHLCV CSV of --tickers symbols x max(--sizes) trading days,
+- stub RSS feeds written to disk and served by a local HTTP server
+  (or read straight from disk with --feeds files),
+- a stub LLM in place of Groq for the end-to-end workflow stage.
+
+For each data size every stage is timed --repeat times (median and best
+wall time are reported) and then run once more under tracemalloc to record
+peak Python memory. Use --json to save the results for comparison between
+commits.
+"""
+import argparse
+import functools
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from email.utils import format_datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import matplotlib
+matplotlib.use("Agg")  # no display while benchmarking
+
+import numpy as np
+import pandas as pd
+
+import NewsAgent as news_module
+from DataAgent import DataAgent
+from AnalysisAgent import AnalysisAgent
+from NewsAgent import NewsAgent
+from ReportAgent import ReportAgent
+from VisualizationAgent import VisualizationAgent
+
+BENCH_TICKER = "SYN000.NS"
+
+
+# ------------------ Synthetic inputs ------------------
+def make_master_csv(path, n_tickers, n_days, seed=42):
+    """Write a master CSV of geometric random-walk OHLCV bars."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end="2025-03-31", periods=n_days)
+    frames = []
+    for i in range(n_tickers):
+        returns = rng.normal(0.0003, 0.015, n_days)
+        close = 100 * (1 + i % 10) * np.exp(np.cumsum(returns))
+        open_ = close * (1 + rng.normal(0, 0.003, n_days))
+        spread = np.abs(rng.normal(0, 0.01, n_days)) * close
+        frames.append(pd.DataFrame({
+            "Date": dates,
+            "Ticker": f"SYN{i:03d}.NS",
+            "Open": open_,
+            "High": np.maximum(open_, close) + spread,
+            "Low": np.minimum(open_, close) - spread,
+            "Close": close,
+            "Volume": rng.integers(100_000, 5_000_000, n_days),
+        }))
+    pd.concat(frames, ignore_index=True).to_csv(path, index=False)
+    return dates[0], dates[-1]
+
+
+def make_rss_feeds(feed_dir, sources, ticker, n_articles, start, end, seed=42):
+    """Write one RSS file per source with n_articles items dated in [start, end]."""
+    rng = np.random.default_rng(seed)
+    words = ["surges", "falls", "beats estimates", "misses estimates", "rallies",
+             "slumps", "upgraded", "downgraded", "holds steady", "expands"]
+    span = (end - start).total_seconds()
+    os.makedirs(feed_dir, exist_ok=True)
+    for source in sources:
+        items = []
+        for j in range(n_articles):
+            published = (start + pd.Timedelta(seconds=float(rng.uniform(0, span)))).floor("s")
+            items.append(
+                "<item>"
+                f"<title>{ticker} {words[j % len(words)]} ({source} #{j})</title>"
+                f"<link>http://localhost/{source}/{j}</link>"
+                f"<pubDate>{format_datetime(published.to_pydatetime())}</pubDate>"
+                "</item>"
+            )
+        body = ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                f"<title>{source}</title>{''.join(items)}</channel></rss>")
+        with open(os.path.join(feed_dir, f"{source}_{ticker}.xml"), "w") as f:
+            f.write(body)
+
+
+def serve_directory(directory):
+    """Serve directory on an ephemeral localhost port. Returns (server, base_url)."""
+    handler = functools.partial(_QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def stub_llm(prompt):
+    return "Stub summary: trend and sentiment are mixed, HOLD."
+
+
+# ------------------ Measurement ------------------
+def measure(fn, setup=None, repeat=3):
+    """
+    Time fn(*setup()) repeat times, then run it once more under tracemalloc.
+    setup runs outside the timed region so copies of inputs are not counted.
+    """
+    times = []
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        t0 = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - t0)
+
+    args = setup() if setup else ()
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_ms": statistics.median(times) * 1000,
+        "min_ms": min(times) * 1000,
+        "peak_mib": peak / 2**20,
+    }
+
+
+def load_workflow():
+    """Import agents.FinancialWorkflow with the LLM stubbed, or None if agno/groq are missing."""
+    os.environ.setdefault("GROQ_API_KEY", "benchmark-stub")
+    os.environ.setdefault("GROQ_MODEL", "benchmark-stub")
+    try:
+        import agents
+    except ImportError as e:
+        print(f"Skipping workflow stage ({e}).")
+        return None
+    agents.llm = stub_llm
+    return agents.FinancialWorkflow
+
+
+# ------------------ Benchmark ------------------
+def run_benchmark(workdir, sizes, n_tickers, n_articles, repeat, feeds):
+    csv_path = os.path.join(workdir, "master_investment_dataset.csv")
+    first_day, last_day = make_master_csv(csv_path, n_tickers, max(sizes))
+    print(f"Synthetic master: {n_tickers} tickers x {max(sizes)} days "
+          f"({os.path.getsize(csv_path) / 2**20:.1f} MiB)")
+
+    feed_dir = os.path.join(workdir, "feeds")
+    make_rss_feeds(feed_dir, news_module.RSS_SOURCES, BENCH_TICKER, n_articles, first_day, last_day)
+    server = None
+    if feeds == "server":
+        server, base = serve_directory(feed_dir)
+    else:
+        base = feed_dir
+    stub_sources = {name: f"{base}/{name}_{{ticker}}.xml" for name in news_module.RSS_SOURCES}
+    # the workflow builds its own NewsAgent, so point the module default at the stubs too
+    news_module.RSS_SOURCES = stub_sources
+
+    workflow_cls = load_workflow()
+    charts_dir = os.path.join(workdir, "charts")
+    reports_dir = os.path.join(workdir, "reports")
+    results = []
+
+    try:
+        for n in sizes:
+            start, end = pd.bdate_range(end=last_day, periods=n)[[0, -1]]
+
+            data_agent = DataAgent(csv_path)
+            df = data_agent.get_data(BENCH_TICKER, start, end)
+            df_ind = data_agent.compute_indicators(df.copy())
+            summary = data_agent.get_indicator_summary(df_ind)
+            analysis_agent = AnalysisAgent(BENCH_TICKER)
+            analysis = analysis_agent.run(df_ind, summary)
+            news_agent = NewsAgent(BENCH_TICKER, sources=stub_sources)
+            articles = news_agent.fetch_news(start, end)
+            sentiment = news_agent.summarize_sentiment(articles)
+            viz_agent = VisualizationAgent(BENCH_TICKER, output_dir=charts_dir)
+            charts = viz_agent(df_ind, analysis, sentiment)
+            report_agent = ReportAgent(reports_dir)
+            payload = {
+                "ticker": BENCH_TICKER, "start": start.date(), "end": end.date(),
+                "technical": summary, "sentiment": sentiment,
+                "final_signal": analysis["signal"], "summary": stub_llm(""),
+                "charts": charts,
+            }
+
+            stages = [
+                ("load_csv", lambda: DataAgent(csv_path), None),
+                ("get_data", lambda: data_agent.get_data(BENCH_TICKER, start, end), None),
+                ("compute_indicators", data_agent.compute_indicators, lambda: (df.copy(),)),
+                ("analysis", lambda: analysis_agent.run(df_ind, summary), None),
+                ("fetch_news", lambda: news_agent.fetch_news(start, end), None),
+                ("visualization", lambda: viz_agent(df_ind, analysis, sentiment), None),
+                ("report_file", lambda: report_agent.generate_report(payload), None),
+                ("report_in_memory", lambda: report_agent.generate_report(payload, in_memory=True), None),
+            ]
+            if workflow_cls is not None:
+                stages.append(("workflow", lambda: workflow_cls().run(BENCH_TICKER, start, end), None))
+
+            for name, fn, setup in stages:
+                stats = measure(fn, setup, repeat)
+                results.append({"stage": name, "rows": len(df), "articles": len(articles), **stats})
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    return results
+
+
+def print_table(results):
+    print(f"\n{'stage':<20}{'rows':>8}{'median ms':>12}{'min ms':>12}{'peak MiB':>11}")
+    print("-" * 63)
+    for r in results:
+        print(f"{r['stage']:<20}{r['rows']:>8}{r['median_ms']:>12.1f}"
+              f"{r['min_ms']:>12.1f}{r['peak_mib']:>11.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline latency/memory benchmark of the agent pipeline.")
+    parser.add_argument("--sizes", default="250,1250,5000",
+                        help="comma-separated number of daily bars per benchmark run")
+    parser.add_argument("--tickers", type=int, default=20, help="symbols in the synthetic master CSV")
+    parser.add_argument("--articles", type=int, default=50, help="items per stub RSS feed")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--feeds", choices=["server", "files"], default="server",
+                        help="serve stub feeds over local HTTP or read them from disk")
+    parser.add_argument("--json", help="also write results to this JSON file")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary workspace")
+    args = parser.parse_args()
+
+    sizes = sorted(int(s) for s in args.sizes.split(","))
+    json_path = os.path.abspath(args.json) if args.json else None
+    workdir = tempfile.mkdtemp(prefix="fin_bench_")
+    cwd = os.getcwd()
+    os.chdir(workdir)  # FinancialWorkflow uses relative paths for its CSV, charts and reports
+    try:
+        results = run_benchmark(workdir, sizes, args.tickers, args.articles, args.repeat, args.feeds)
+    finally:
+        os.chdir(cwd)
+        if args.keep:
+            print(f"Workspace kept at {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_table(results)
+    if json_path:
+        meta = {"python": sys.version.split()[0], "pandas": pd.__version__, "numpy": np.__version__,
+                "tickers": args.tickers, "repeat": args.repeat}
+        with open(json_path, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+        print(f"\nResults written to {json_path}")
+
+
+if __name__ == "__main__":
+    main()
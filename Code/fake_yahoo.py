@@ -0,0 +1,297 @@
+# fake_yahoo.py
+"""
+Local stand-in for Yahoo's chart API that injects failures, for exercising
+the retry / rate-limit / circuit-breaker behaviour of yahoo_fetcher.py.
+
+    python fake_yahoo.py --port 8899 --fail-rate 0.3 --faults 429,500,reset
+    YAHOO_CHART_URL=http://127.0.0.1:8899 streamlit run app.py
+
+    python fake_yahoo.py --selftest
+
+Served: GET /v8/finance/chart/<TICKER>?period1=&period2=&interval=1d
+(or ?range=60d&interval=5m) with synthetic random-walk bars. Tickers that
+start with MISSING answer 404. With probability --fail-rate a request gets
+one of the --faults instead:
+- 429   : Too Many Requests
+- 500 / 503 : server error
+- reset : connection closed without a response
+- slow  : response delayed by --slow-seconds (client times out)
+- garbled : HTTP 200 with a chart result that has no price arrays
+
+--selftest starts the server on a free port and runs the fetcher through
+flaky, outage, recovery, garbled-trial, throttling and unknown-ticker scenarios, printing
+PASS/FAIL for each (exit status 1 if any fail).
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+import pandas as pd
+
+from yahoo_fetcher import (
+    ChartAPITransport, CircuitBreaker, CircuitOpenError, NoDataError,
+    PermanentFetchError, TransientFetchError, YahooFetcher,
+)
+
+FAULTS = ("429", "500", "503", "reset", "slow", "garbled")
+IST = "Asia/Kolkata"
+
+
+# ------------------ Fake server ------------------
+def make_bars(ticker, start, end, interval):
+    """Deterministic random-walk bars for ticker as chart-API arrays."""
+    if interval == "1d":
+        dates = pd.bdate_range(start, end, tz=IST)
+    else:
+        days = pd.bdate_range(start, end)
+        step = interval.replace("m", "min")
+        dates = pd.DatetimeIndex([]).tz_localize(IST)
+        for day in days:
+            session = pd.date_range(day + pd.Timedelta("9h15min"), day + pd.Timedelta("15h29min"),
+                                    freq=step, tz=IST)
+            dates = dates.append(session)
+
+    rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, len(dates))))
+    open_ = close * (1 + rng.normal(0, 0.002, len(dates)))
+    return {
+        "timestamp": [int(d.timestamp()) for d in dates],
+        "open": open_.round(2).tolist(),
+        "high": (np.maximum(open_, close) * 1.005).round(2).tolist(),
+        "low": (np.minimum(open_, close) * 0.995).round(2).tolist(),
+        "close": close.round(2).tolist(),
+        "volume": rng.integers(10_000, 1_000_000, len(dates)).tolist(),
+    }
+
+
+class FakeYahooHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            fault = server.rng.choice(server.faults) if server.rng.random() < server.fail_rate else None
+
+        if fault == "reset":
+            self.close_connection = True
+            return
+        if fault == "slow":
+            time.sleep(server.slow_seconds)
+        elif fault in ("429", "500", "503"):
+            return self._send(int(fault), {"chart": {"result": None, "error": {"code": fault}}},
+                              {"Retry-After": "0"} if fault == "429" else None)
+        elif fault == "garbled":
+            return self._send(200, {"chart": {"result": [{"timestamp": [0]}], "error": None}})
+
+        url = urlparse(self.path)
+        prefix = "/v8/finance/chart/"
+        if not url.path.startswith(prefix):
+            return self._send(404, {"error": "not found"})
+        ticker = url.path[len(prefix):]
+        if ticker.upper().startswith("MISSING"):
+            return self._send(404, {"chart": {"result": None, "error": {"code": "Not Found"}}})
+
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        interval = query.get("interval", "1d")
+        if "range" in query:
+            end = pd.Timestamp.today().normalize()
+            start = end - pd.Timedelta(days=int(query["range"].rstrip("d")))
+        else:
+            start = pd.Timestamp(int(query["period1"]), unit="s")
+            end = pd.Timestamp(int(query["period2"]), unit="s")
+
+        bars = make_bars(ticker, start, end, interval)
+        result = {
+            "meta": {"symbol": ticker, "exchangeTimezoneName": IST},
+            "timestamp": bars.pop("timestamp"),
+            "indicators": {"quote": [bars]},
+        }
+        self._send(200, {"chart": {"result": [result], "error": None}})
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client gave up (slow fault)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(port=0, fail_rate=0.0, faults=FAULTS, slow_seconds=2.0, seed=0):
+    """Start the fake API in a daemon thread; returns the server (base URL in .url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeYahooHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.rng = random.Random(seed)
+    server.requests = 0
+    server.fail_rate = fail_rate
+    server.faults = list(faults)
+    server.slow_seconds = slow_seconds
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ------------------ Self-test scenarios ------------------
+def _fetcher(server, **kwargs):
+    options = dict(rate=1000, burst=1000, max_retries=4, backoff_base=0.02, backoff_cap=0.2,
+                   breaker=CircuitBreaker(threshold=5, reset_timeout=0.5))
+    options.update(kwargs)
+    return YahooFetcher(ChartAPITransport(server.url, timeout=0.3), **options)
+
+
+def scenario_flaky(server):
+    server.fail_rate, server.faults = 0.3, ["429", "500", "503", "reset", "slow"]
+    fetcher = _fetcher(server)
+    before = server.requests
+    for i in range(20):
+        df = fetcher.fetch(f"SYN{i:03d}.NS", start="2025-01-01", end="2025-03-31")
+        assert len(df) > 50 and df["Close"].notna().all()
+    return f"20 tickers fetched with {server.requests - before - 20} retries"
+
+
+def scenario_outage(server):
+    server.fail_rate, server.faults = 1.0, ["503"]
+    fetcher = _fetcher(server, max_retries=2)
+    for _ in range(2):
+        try:
+            fetcher.fetch("SYN000.NS", start="2025-01-01", end="2025-03-31")
+        except CircuitOpenError:
+            break
+        except TransientFetchError:
+            continue
+    assert fetcher.breaker.state == "open", fetcher.breaker.state
+
+    before = server.requests
+    t0 = time.perf_counter()
+    try:
+        fetcher.fetch("SYN001.NS", start="2025-01-01", end="2025-03-31")
+        raise AssertionError("expected CircuitOpenError")
+    except CircuitOpenError:
+        pass
+    elapsed = time.perf_counter() - t0
+    assert server.requests == before, "open circuit still called upstream"
+    scenario_outage.fetcher = fetcher
+    return f"circuit opened; next call failed fast in {elapsed * 1000:.2f} ms"
+
+
+def scenario_recovery(server):
+    fetcher = scenario_outage.fetcher
+    server.fail_rate = 0.0
+    time.sleep(fetcher.breaker.reset_timeout)
+    assert fetcher.breaker.state == "half_open", fetcher.breaker.state
+    fetcher.fetch("SYN002.NS", start="2025-01-01", end="2025-03-31")
+    assert fetcher.breaker.state == "closed", fetcher.breaker.state
+    return "half-open trial succeeded, circuit closed"
+
+
+def scenario_garbled(server):
+    server.fail_rate, server.faults = 1.0, ["503"]
+    fetcher = _fetcher(server, max_retries=0, breaker=CircuitBreaker(threshold=1, reset_timeout=0.2))
+    try:
+        fetcher.fetch("SYN000.NS", start="2025-01-01", end="2025-03-31")
+    except TransientFetchError:
+        pass
+    time.sleep(fetcher.breaker.reset_timeout)
+
+    server.faults = ["garbled"]
+    try:
+        fetcher.fetch("SYN000.NS", start="2025-01-01", end="2025-03-31")
+        raise AssertionError("expected PermanentFetchError")
+    except PermanentFetchError:
+        pass
+    assert not fetcher.breaker.trial_in_flight, "trial left in flight"
+
+    server.fail_rate = 0.0
+    time.sleep(fetcher.breaker.reset_timeout)
+    fetcher.fetch("SYN000.NS", start="2025-01-01", end="2025-03-31")
+    assert fetcher.breaker.state == "closed", fetcher.breaker.state
+    return "unparseable trial answer reopened the circuit; next trial closed it"
+
+
+def scenario_throttle(server):
+    server.fail_rate = 0.0
+    rate, burst, n = 20, 5, 25
+    fetcher = _fetcher(server, rate=rate, burst=burst)
+    t0 = time.perf_counter()
+    for i in range(n):
+        fetcher.fetch(f"SYN{i:03d}.NS", start="2025-03-01", end="2025-03-31")
+    elapsed = time.perf_counter() - t0
+    floor = (n - burst) / rate
+    assert elapsed >= floor * 0.95, f"{elapsed:.2f}s < {floor:.2f}s"
+    return f"{n} requests at {rate}/s (burst {burst}) took {elapsed:.2f}s (floor {floor:.2f}s)"
+
+
+def scenario_unknown(server):
+    server.fail_rate = 0.0
+    fetcher = _fetcher(server)
+    before = server.requests
+    try:
+        fetcher.fetch("MISSING.NS", start="2025-01-01", end="2025-03-31")
+        raise AssertionError("expected NoDataError")
+    except NoDataError:
+        pass
+    assert server.requests - before == 1, "NoDataError was retried"
+    assert fetcher.breaker.state == "closed"
+    return "404 raised NoDataError without retries"
+
+
+def selftest():
+    server = start_server(slow_seconds=1.0)
+    failed = 0
+    for scenario in (scenario_flaky, scenario_outage, scenario_recovery, scenario_garbled,
+                     scenario_throttle, scenario_unknown):
+        name = scenario.__name__.replace("scenario_", "")
+        try:
+            print(f"PASS {name:10s} {scenario(server)}")
+        except Exception as e:
+            failed += 1
+            print(f"FAIL {name:10s} {type(e).__name__}: {e}")
+    server.shutdown()
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Yahoo chart API with failure injection.")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests that fail")
+    parser.add_argument("--faults", default="429,500,503,reset",
+                        help=f"comma-separated subset of {','.join(FAULTS)}")
+    parser.add_argument("--slow-seconds", type=float, default=15.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--selftest", action="store_true", help="run the fetcher scenarios and exit")
+    args = parser.parse_args()
+
+    if args.selftest:
+        sys.exit(1 if selftest() else 0)
+
+    faults = [f.strip() for f in args.faults.split(",") if f.strip()]
+    unknown = set(faults) - set(FAULTS)
+    if unknown:
+        parser.error(f"unknown faults: {', '.join(sorted(unknown))}")
+
+    server = start_server(args.port, args.fail_rate, faults, args.slow_seconds, args.seed)
+    print(f"Fake Yahoo chart API on {server.url} (fail rate {args.fail_rate:.0%}, faults {faults})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# intraday.py
+"""
+Time-chunked on-disk store for intraday (1m / 5m) bars.
+
+Layout: <root>/<interval>/<TICKER>/<YYYY-MM>.npz, one file per ticker and
+calendar month, holding the same compact columns as the daily master
+(datetime64 Date, int32 paise prices, int64 Volume). A month of 1-minute NSE
+bars is ~8k rows, so a range read only ever holds one small chunk in memory
+no matter how long the range is.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+INTERVALS = ("1m", "5m")
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+PRICE_SCALE = 100  # prices are stored in paise, read back as float64 rupees
+
+
+class IntradayStore:
+    def __init__(self, root="intraday"):
+        self.root = root
+
+    def _ticker_dir(self, ticker, interval):
+        if interval not in INTERVALS:
+            raise ValueError(f"Unknown interval '{interval}'. Use one of {list(INTERVALS)}.")
+        return os.path.join(self.root, interval, ticker)
+
+    def months(self, ticker, interval):
+        """Sorted list of month keys ("YYYY-MM") stored for ticker."""
+        path = self._ticker_dir(ticker, interval)
+        if not os.path.isdir(path):
+            return []
+        return sorted(f[:-4] for f in os.listdir(path) if f.endswith(".npz") and ".tmp" not in f)
+
+    def read_chunk(self, ticker, interval, month):
+        path = os.path.join(self._ticker_dir(ticker, interval), month + ".npz")
+        with np.load(path) as z:
+            df = pd.DataFrame({col: z[col] for col in ["Date"] + PRICE_COLUMNS + ["Volume"]})
+        for col in PRICE_COLUMNS:
+            if df[col].dtype.kind == "i":
+                df[col] = df[col] / PRICE_SCALE
+            else:
+                df[col] = df[col].astype("float64")  # chunks written before the paise layout
+        df.insert(1, "Ticker", ticker)
+        return df
+
+    def _write_chunk(self, ticker, interval, month, df):
+        path = self._ticker_dir(ticker, interval)
+        os.makedirs(path, exist_ok=True)
+        tmp_path = os.path.join(path, f"{month}.{os.getpid()}.{threading.get_ident()}.tmp.npz")
+        np.savez(
+            tmp_path,
+            Date=df["Date"].to_numpy(dtype="datetime64[ns]"),
+            **{col: (df[col].astype("float64") * PRICE_SCALE).round().to_numpy(dtype="int32")
+               for col in PRICE_COLUMNS},
+            Volume=df["Volume"].to_numpy(dtype="int64"),
+        )
+        os.replace(tmp_path, os.path.join(path, month + ".npz"))
+
+    def append(self, ticker, interval, bars):
+        """
+        Merge new bars (columns Date, Open, High, Low, Close, Volume) into the
+        month chunks they fall in. Existing bars with the same timestamp are
+        replaced. Only the touched months are read and rewritten.
+        """
+        bars = bars.dropna(subset=PRICE_COLUMNS).copy()
+        bars["Date"] = pd.to_datetime(bars["Date"])
+        bars["Volume"] = pd.to_numeric(bars["Volume"], errors="coerce").fillna(0)
+        stored = set(self.months(ticker, interval))
+
+        for month, new in bars.groupby(bars["Date"].dt.strftime("%Y-%m")):
+            if month in stored:
+                new = pd.concat([self.read_chunk(ticker, interval, month), new], ignore_index=True)
+            new = new.drop_duplicates("Date", keep="last").sort_values("Date")
+            self._write_chunk(ticker, interval, month, new)
+
+    def iter_chunks(self, ticker, interval, start, end):
+        """
+        Yield one DataFrame per stored month overlapping [start, end], in time order.
+        An end without a time of day includes that whole day.
+        """
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        first, last = start.strftime("%Y-%m"), end.strftime("%Y-%m")
+        if end == end.normalize():
+            in_range = lambda dates: (dates >= start) & (dates < end + pd.Timedelta(days=1))
+        else:
+            in_range = lambda dates: (dates >= start) & (dates <= end)
+        for month in self.months(ticker, interval):
+            if month < first or month > last:
+                continue
+            df = self.read_chunk(ticker, interval, month)
+            df = df[in_range(df["Date"])]
+            if not df.empty:
+                yield df.reset_index(drop=True)
@@ -0,0 +1,217 @@
+# replay.py
+"""
+Record / replay of workflow runs, to reproduce a slow or wrong report offline.
+
+Record mode captures every external input of one FinancialWorkflow run into a
+bundle (a zip file):
+- manifest.json : ticker, date range, timeframe, and the LLM prompts/responses
+- prices.csv    : the price frame returned by DataAgent.get_data
+- feeds/NNN.xml : the raw body of every RSS feed, keyed by URL in the manifest
+
+Replay mode re-runs the same pipeline from the bundle with no network access:
+prices, feeds and the LLM answer come from the bundle; indicators, analysis,
+charts and the PDF are computed again by the current code.
+
+    python replay.py record RELIANCE --start 2024-01-01 --end 2025-03-31 --bundle run.zip
+    python replay.py run run.zip --profile profiles
+
+The active session lives in a context variable (like tracing's current Trace),
+so the agents only ask replay.current() and concurrent runs do not interfere.
+"""
+import argparse
+import io
+import json
+import os
+import tempfile
+import urllib.request
+import zipfile
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+import pandas as pd
+
+_current_session = ContextVar("replay_session", default=None)
+
+BUNDLE_VERSION = 1
+
+
+class Session:
+    def __init__(self, mode, path):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown replay mode '{mode}'.")
+        self.mode = mode
+        self.path = path
+        self.manifest = {"version": BUNDLE_VERSION, "feeds": {}, "llm": []}
+        self.prices = None
+        self.feeds = {}
+        self.llm_calls = 0
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    # ------------------ Inputs ------------------
+    def record_prices(self, df):
+        self.prices = df.copy()
+
+    def rss_body(self, url):
+        """Raw feed body for url: fetched and kept when recording, read back when replaying."""
+        if self.replaying:
+            if url not in self.feeds:
+                print(f"Bundle has no recording of {url}; treating the feed as empty.")
+            return self.feeds.get(url, b"")
+
+        import feedparser
+        try:
+            if os.path.exists(url):
+                with open(url, "rb") as f:
+                    body = f.read()
+            else:
+                request = urllib.request.Request(url, headers={"User-Agent": feedparser.USER_AGENT})
+                with urllib.request.urlopen(request, timeout=15) as response:
+                    body = response.read()
+        except (OSError, ValueError) as e:
+            # feedparser.parse(url) swallows fetch errors too; keep that behaviour
+            print(f"RSS fetch failed for {url}: {e}")
+            body = b""
+        self.feeds[url] = body
+        return body
+
+    def record_llm(self, prompt, response):
+        self.manifest["llm"].append({"prompt": prompt, "response": response})
+
+    def llm_response(self, prompt):
+        """Next recorded LLM response, in call order."""
+        calls = self.manifest["llm"]
+        if self.llm_calls >= len(calls):
+            raise RuntimeError(f"Bundle has no recorded LLM response for call #{self.llm_calls + 1}.")
+        call = calls[self.llm_calls]
+        self.llm_calls += 1
+        if call["prompt"] != prompt:
+            print("Note: LLM prompt differs from the recorded one; replaying the recorded response.")
+        return call["response"]
+
+    # ------------------ Bundle file ------------------
+    def save(self, **run_attrs):
+        self.manifest.update({k: str(v) for k, v in run_attrs.items()})
+        self.manifest["recorded_at"] = datetime.now().isoformat(timespec="seconds")
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as z:
+            for i, (url, body) in enumerate(self.feeds.items()):
+                name = f"feeds/{i:03d}.xml"
+                self.manifest["feeds"][url] = name
+                z.writestr(name, body)
+            if self.prices is not None:
+                z.writestr("prices.csv", self.prices.to_csv(index=False))
+            z.writestr("manifest.json", json.dumps(self.manifest, indent=2))
+        os.replace(tmp_path, self.path)
+        print(f"Replay bundle saved at: {self.path}")
+
+    def load(self):
+        from DataAgent import compact_frame, to_rupees
+
+        with zipfile.ZipFile(self.path) as z:
+            self.manifest = json.loads(z.read("manifest.json"))
+            if self.manifest.get("version") != BUNDLE_VERSION:
+                raise ValueError(f"Unsupported bundle version {self.manifest.get('version')}.")
+            self.feeds = {url: z.read(name) for url, name in self.manifest["feeds"].items()}
+            if "prices.csv" not in z.namelist():
+                # recorded runs that failed before get_data returned still save a bundle
+                raise ValueError(f"Bundle {self.path} has no price frame; the recorded run "
+                                 f"failed before its data was loaded, so it cannot be replayed.")
+            prices = pd.read_csv(io.BytesIO(z.read("prices.csv")), parse_dates=["Date"])
+            self.prices = to_rupees(compact_frame(prices))
+        return self
+
+
+# ------------------ Helpers used by the agents ------------------
+def current():
+    return _current_session.get()
+
+
+def rss_source(url):
+    """What to hand to feedparser.parse: the URL itself, or the recorded/replayed body."""
+    session = current()
+    return url if session is None else session.rss_body(url)
+
+
+@contextmanager
+def session(record=None, replay=None, **run_attrs):
+    """
+    Activate a session for one run: record=<bundle path> captures inputs and
+    saves the bundle on exit (also when the run fails), replay=<bundle path>
+    serves them. With neither, yields None and changes nothing.
+    """
+    if record and replay:
+        raise ValueError("Pass either record or replay, not both.")
+    if not (record or replay):
+        yield None
+        return
+
+    s = Session("record", record) if record else Session("replay", replay).load()
+    token = _current_session.set(s)
+    try:
+        yield s
+    finally:
+        _current_session.reset(token)
+        if not s.replaying:
+            s.save(**run_attrs)
+
+
+# ------------------ CLI ------------------
+def _print_trace(trace):
+    print(f"\n{trace['status']} in {trace['wall_s']:.3f}s wall / {trace['cpu_s']:.3f}s CPU")
+    for stage in trace["stages"]:
+        line = f"  {stage['stage']:14s} {stage['wall_s'] * 1000:9.1f} ms  {stage['cpu_s'] * 1000:9.1f} ms CPU"
+        if stage.get("profile"):
+            line += f"  {stage['profile']}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record a workflow run to a bundle, or replay one offline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="run live and save every external input")
+    rec.add_argument("ticker")
+    rec.add_argument("--start", required=True)
+    rec.add_argument("--end", required=True)
+    rec.add_argument("--timeframe", default="daily")
+    rec.add_argument("--bundle", required=True, help="zip file to write")
+
+    run = sub.add_parser("run", help="re-run a recorded bundle offline")
+    run.add_argument("bundle")
+
+    for p in (rec, run):
+        p.add_argument("--profile", default="", metavar="DIR",
+                       help="write a cProfile dump per stage under DIR")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        # The LLM is never called during replay, so no real key is needed
+        os.environ.setdefault("GROQ_API_KEY", "replay")
+        os.environ.setdefault("GROQ_MODEL", "replay")
+    from agents import FinancialWorkflow
+
+    charts_dir = tempfile.mkdtemp(prefix="replay_charts_")
+    if args.command == "record":
+        ticker, timeframe = args.ticker, args.timeframe
+        start, end = pd.Timestamp(args.start), pd.Timestamp(args.end)
+        options = {"record": args.bundle}
+    else:
+        manifest = Session("replay", args.bundle).load().manifest
+        ticker, timeframe = manifest["ticker"], manifest["timeframe"]
+        start, end = pd.Timestamp(manifest["start"]), pd.Timestamp(manifest["end"])
+        options = {"replay": args.bundle}
+        print(f"Replaying {ticker} {start.date()} -> {end.date()} ({timeframe}), "
+              f"recorded {manifest['recorded_at']}")
+
+    result = FinancialWorkflow().run(ticker, start, end, in_memory=True, timeframe=timeframe,
+                                     charts_dir=charts_dir, profile=args.profile or None, **options)
+    _print_trace(result["trace"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+# server.py
+"""
+Headless HTTP API for the analysis pipeline, for internal callers that do
+not go through the Streamlit UI.
+
+    python server.py --port 8000 --workers 4 --queue 16
+
+Endpoints (POST, JSON body; dates default to the standard one-year window):
+- /analyse : {"ticker", "start", "end", "timeframe", "news": true}
+             -> indicators, trend/score/signal, news sentiment
+- /screen  : {"tickers": [...] (default: whole master), "start", "end",
+              "signals": ["BUY"], "min_score": 60, "limit": 50}
+             -> analyses sorted by score
+- /report  : {"ticker", "start", "end", "timeframe", "charts": false, "profile": false}
+             -> LLM summary and base64 PDF (and PNG charts);
+                add ?format=pdf to get the PDF bytes directly;
+                "profile": true writes per-stage cProfile dumps under PROFILE_DIR
+GET /health and GET /metrics (Prometheus text) are also served.
+
+Work runs on a bounded thread pool. At most workers + queue requests are
+accepted at once; beyond that the server answers 503 with Retry-After.
+Identical requests that arrive while one is in flight share its result.
+
+Errors: 400 invalid body or unknown ticker, 404 no price data for the
+window, 501 /report without the LLM workflow, 503 busy or Yahoo
+unavailable, 504 timeout, 500 anything else (a server bug).
+"""
+import argparse
+import base64
+import json
+import math
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import matplotlib
+matplotlib.use("Agg")  # no display in the server
+
+import pandas as pd
+
+from DataAgent import DataAgent, TIMEFRAMES
+from AnalysisAgent import AnalysisAgent
+from NewsAgent import NewsAgent
+from snapshots import SnapshotStore, STANDARD_LOOKBACK_DAYS
+import tracing
+from yahoo_fetcher import FetchError, NoDataError
+
+CSV_PATH = "master_investment_dataset.csv"
+PROFILE_DIR = "profiles"
+
+
+class Overloaded(Exception):
+    pass
+
+
+class BadRequest(Exception):
+    """The request body is invalid; answered with 400."""
+
+
+class ReportUnavailable(Exception):
+    """The LLM workflow is not installed or configured; answered with 501."""
+
+
+# ------------------ Worker pool ------------------
+class RequestPool:
+    """Bounded executor with admission control and coalescing of identical in-flight requests."""
+
+    def __init__(self, workers=4, queue_size=16):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis")
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.lock = threading.Lock()
+        self.inflight = {}
+
+    def submit(self, key, fn, *args):
+        with self.lock:
+            future = self.inflight.get(key)
+            if future is not None:
+                tracing.METRICS.inc("api_coalesced_total")
+                return future
+            if not self.slots.acquire(blocking=False):
+                raise Overloaded()
+            future = self.executor.submit(fn, *args)
+            self.inflight[key] = future
+        future.add_done_callback(lambda _: self._release(key))
+        return future
+
+    def _release(self, key):
+        with self.lock:
+            self.inflight.pop(key, None)
+        self.slots.release()
+
+
+# ------------------ Request validation ------------------
+def _window(body):
+    try:
+        end = pd.Timestamp(body.get("end") or pd.Timestamp.today().normalize())
+        start = pd.Timestamp(body.get("start") or end - pd.Timedelta(days=STANDARD_LOOKBACK_DAYS))
+    except (TypeError, ValueError) as e:
+        raise BadRequest(f"Invalid date: {e}")
+    if start > end:
+        raise BadRequest("start must not be after end")
+    return start, end
+
+
+def _ticker(body):
+    ticker = body.get("ticker")
+    if not isinstance(ticker, str) or not ticker.strip():
+        raise BadRequest('"ticker" is required')
+    return ticker
+
+
+def _timeframe(body):
+    timeframe = body.get("timeframe", "daily")
+    if timeframe not in TIMEFRAMES:
+        raise BadRequest(f"Unknown timeframe {timeframe!r}. Use one of {list(TIMEFRAMES)}.")
+    return timeframe
+
+
+def _normalize(data_agent, user_ticker):
+    try:
+        return data_agent.normalize_ticker(user_ticker)
+    except ValueError as e:  # unknown symbol
+        raise BadRequest(str(e))
+
+
+# ------------------ Request handlers ------------------
+
+
+def _clean(value):
+    """Make agent output JSON-safe: NaN -> None, numpy scalars -> Python, timestamps -> str."""
+    if isinstance(value, dict):
+        return {k: _clean(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_clean(v) for v in value]
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, (pd.Timestamp,)):
+        return str(value)
+    return value
+
+
+def analyse_one(data_agent, user_ticker, start, end, timeframe="daily", news=False):
+    ticker = _normalize(data_agent, user_ticker)
+
+    snapshot = None
+    if timeframe == "daily":
+        snapshot = SnapshotStore().get(ticker, start, end, as_of=data_agent.last_bar_date(ticker, end))
+        tracing.cache("snapshot", hit=snapshot is not None)
+
+    if snapshot is not None:
+        indicators, analysis, rows = snapshot["indicators"], snapshot["analysis"], len(snapshot["df"])
+    else:
+        df = data_agent.get_data(ticker, start, end, timeframe=timeframe)
+        df = data_agent.compute_indicators(df)
+        indicators = data_agent.get_indicator_summary(df)
+        analysis = AnalysisAgent(ticker).run(df, indicators)
+        rows = len(df)
+
+    result = {
+        "ticker": ticker,
+        "start": str(start.date()),
+        "end": str(end.date()),
+        "timeframe": timeframe,
+        "rows": rows,
+        "from_snapshot": snapshot is not None,
+        "indicators": indicators,
+        "trend": analysis["trend"],
+        "score": analysis["score"],
+        "signal": analysis["signal"],
+        "indicator_explanations": analysis["indicator_explanations"],
+    }
+    if news:
+        news_agent = NewsAgent(ticker)
+        articles = news_agent.fetch_news(start, end)
+        result["sentiment"] = news_agent.summarize_sentiment(articles)
+        result["articles"] = articles
+    return result
+
+
+def handle_analyse(body):
+    ticker, (start, end), timeframe = _ticker(body), _window(body), _timeframe(body)
+    with tracing.Trace("api_analyse", ticker=ticker) as trace:
+        data_agent = DataAgent(CSV_PATH, mmap=True)
+        with trace.stage("analyse"):
+            result = analyse_one(data_agent, ticker, start, end, timeframe, bool(body.get("news", True)))
+    return result
+
+
+def handle_screen(body):
+    start, end = _window(body)
+    timeframe = _timeframe(body)
+    signals = body.get("signals") or []
+    tickers = body.get("tickers")
+    min_score, limit = body.get("min_score", 0), body.get("limit", 50)
+    if not isinstance(signals, list) or (tickers is not None and not isinstance(tickers, list)):
+        raise BadRequest('"signals" and "tickers" must be lists')
+    if not isinstance(min_score, (int, float)) or not isinstance(limit, int):
+        raise BadRequest('"min_score" must be a number and "limit" an integer')
+    signals = set(signals)
+
+    with tracing.Trace("api_screen") as trace:
+        data_agent = DataAgent(CSV_PATH, mmap=True)
+        tickers = tickers or list(data_agent.data["Ticker"].cat.categories)
+
+        matches, errors = [], {}
+        with trace.stage("screen"):
+            for ticker in tickers:
+                try:
+                    r = analyse_one(data_agent, ticker, start, end, timeframe)
+                except Exception as e:
+                    errors[ticker] = str(e)
+                    continue
+                if r["score"] >= min_score and (not signals or r["signal"] in signals):
+                    matches.append(r)
+        trace.count("screened", len(tickers))
+
+    matches.sort(key=lambda r: r["score"], reverse=True)
+    return {
+        "start": str(start.date()),
+        "end": str(end.date()),
+        "screened": len(tickers),
+        "matches": matches[:limit],
+        "errors": errors,
+    }
+
+
+def handle_report(body):
+    ticker, (start, end), timeframe = _ticker(body), _window(body), _timeframe(body)
+    try:
+        from agents import FinancialWorkflow
+    except (ImportError, KeyError) as e:
+        raise ReportUnavailable(f"Report generation needs the LLM workflow: {e}")
+
+    # Charts go to a private directory: VisualizationAgent uses fixed file names
+    charts_dir = tempfile.mkdtemp(prefix="report_charts_")
+    try:
+        result = FinancialWorkflow().run(ticker, start, end, in_memory=True, timeframe=timeframe,
+                                         charts_dir=charts_dir, csv_path=CSV_PATH,
+                                         profile=PROFILE_DIR if body.get("profile") else None)
+        response = {
+            "ticker": ticker,
+            "summary": result["summary"],
+            "articles": result["articles"],
+            "trace": result["trace"],
+            "pdf_bytes": result["pdf_bytes"],
+        }
+        if body.get("charts"):
+            response["charts"] = {}
+            for name, path in _flatten(result["charts"]):
+                with open(path, "rb") as f:
+                    response["charts"][name] = base64.b64encode(f.read()).decode()
+        return response
+    finally:
+        shutil.rmtree(charts_dir, ignore_errors=True)
+
+
+def _flatten(charts, prefix=""):
+    for key, value in charts.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}", value
+
+
+ENDPOINTS = {
+    "/analyse": handle_analyse,
+    "/screen": handle_screen,
+    "/report": handle_report,
+}
+
+
+# ------------------ HTTP layer ------------------
+class APIHandler(BaseHTTPRequestHandler):
+    pool = None
+    timeout_s = 120
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif path == "/metrics":
+            self._send(200, tracing.METRICS.to_prometheus().encode(), "text/plain; version=0.0.4")
+        else:
+            self._send_json(404, {"error": f"Unknown path {path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        handler = ENDPOINTS.get(url.path)
+        if handler is None:
+            return self._send_json(404, {"error": f"Unknown path {url.path}"})
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            body = None
+        if not isinstance(body, dict):
+            return self._respond_error(url.path, 400, "Body must be a JSON object")
+
+        key = (url.path, json.dumps(body, sort_keys=True))
+        try:
+            future = self.pool.submit(key, handler, body)
+            result = future.result(timeout=self.timeout_s)
+        except Overloaded:
+            tracing.METRICS.inc("api_requests_total", endpoint=url.path, status="503")
+            return self._send_json(503, {"error": "Server busy, retry later"}, {"Retry-After": "5"})
+        except TimeoutError:
+            return self._respond_error(url.path, 504, "Analysis timed out")
+        except BadRequest as e:
+            return self._respond_error(url.path, 400, str(e))
+        except NoDataError as e:
+            return self._respond_error(url.path, 404, str(e))
+        except ReportUnavailable as e:
+            return self._respond_error(url.path, 501, str(e))
+        except FetchError as e:
+            # Yahoo is throttling or down and there was no stored data to fall back on
+            retry_after = int(getattr(e, "retry_after", None) or 30)
+            tracing.METRICS.inc("api_requests_total", endpoint=url.path, status="503")
+            return self._send_json(503, {"error": f"{type(e).__name__}: {e}"},
+                                   {"Retry-After": str(retry_after)})
+        except Exception as e:
+            return self._respond_error(url.path, 500, f"{type(e).__name__}: {e}")
+
+        tracing.METRICS.inc("api_requests_total", endpoint=url.path, status="200")
+        pdf_bytes = result.get("pdf_bytes") if isinstance(result, dict) else None
+        if pdf_bytes is not None and parse_qs(url.query).get("format") == ["pdf"]:
+            return self._send(200, pdf_bytes, "application/pdf")
+        if pdf_bytes is not None:
+            result = {k: v for k, v in result.items() if k != "pdf_bytes"}
+            result["pdf_base64"] = base64.b64encode(pdf_bytes).decode()
+        self._send_json(200, result)
+
+    def _respond_error(self, path, status, message):
+        tracing.METRICS.inc("api_requests_total", endpoint=path, status=str(status))
+        self._send_json(status, {"error": message})
+
+    def _send_json(self, status, payload, headers=None):
+        self._send(status, json.dumps(_clean(payload), default=str).encode(), "application/json", headers)
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        print(f"[api] {self.address_string()} {fmt % args}")
+
+
+def main():
+    global CSV_PATH
+
+    parser = argparse.ArgumentParser(description="Headless HTTP API for the analysis pipeline.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=4, help="analysis requests run in parallel")
+    parser.add_argument("--queue", type=int, default=16, help="requests allowed to wait for a worker")
+    parser.add_argument("--timeout", type=int, default=120, help="seconds before a request gets 504")
+    parser.add_argument("--csv", default=CSV_PATH)
+    args = parser.parse_args()
+
+    CSV_PATH = args.csv
+    APIHandler.pool = RequestPool(args.workers, args.queue)
+    APIHandler.timeout_s = args.timeout
+
+    server = ThreadingHTTPServer((args.host, args.port), APIHandler)
+    print(f"Serving analysis API on {args.host}:{args.port} "
+          f"({args.workers} workers, queue {args.queue})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
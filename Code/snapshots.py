@@ -0,0 +1,176 @@
+# snapshots.py
+"""
+Nightly analysis snapshots for the "latest view, standard lookback" request.
+
+Run after market close:
+
+    python snapshots.py --end 2025-03-31
+
+For every ticker in the master dataset (or a --watchlist), this runs
+compute_indicators, get_indicator_summary and AnalysisAgent.run over the
+window [end - STANDARD_LOOKBACK_DAYS, end] and stores the result in a SQLite
+table keyed by (ticker, lookback, as_of), where as_of is the date of the last
+bar in the window. A request is served from the snapshot when it asks for the
+same lookback length and the newest stored bar on or before its end date is
+the snapshot's as_of, so "one year up to today" keeps hitting through the
+next trading day. A snapshot is only served while it is current: its window
+ends on or after the requested end, or its as_of is at most one trading day
+before it. An older one (the nightly job stopped, or one ticker kept failing)
+misses, so the live path downloads the missing days. Anything else falls back
+to live computation, so custom date ranges behave exactly as before.
+"""
+import argparse
+import json
+import sqlite3
+import time
+from datetime import datetime
+from io import StringIO
+
+import pandas as pd
+
+from DataAgent import DataAgent
+from AnalysisAgent import AnalysisAgent
+
+STANDARD_LOOKBACK_DAYS = 365
+SNAPSHOT_DB = "snapshots.db"
+
+
+def _day(date):
+    return str(pd.Timestamp(date).date())
+
+
+def lookback_days(start_date, end_date):
+    return (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days
+
+
+class SnapshotStore:
+    """SQLite table of precomputed analysis results, one row per (ticker, lookback, as_of)."""
+
+    def __init__(self, db_path=SNAPSHOT_DB):
+        self.db_path = db_path
+        with self._connect() as conn:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(snapshots)")]
+            if columns and "as_of" not in columns:
+                # Table from the exact-window layout; snapshots are rebuilt nightly anyway
+                print("Dropping snapshots in the old exact-window layout.")
+                conn.execute("DROP TABLE snapshots")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    ticker      TEXT NOT NULL,
+                    lookback    INTEGER NOT NULL,
+                    as_of       TEXT NOT NULL,
+                    start       TEXT NOT NULL,
+                    end         TEXT NOT NULL,
+                    computed_at TEXT NOT NULL,
+                    indicators  TEXT NOT NULL,
+                    analysis    TEXT NOT NULL,
+                    bars        TEXT NOT NULL,
+                    PRIMARY KEY (ticker, lookback, as_of)
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def get(self, ticker, start_date, end_date, as_of):
+        """
+        Return {"df", "indicators", "analysis", "computed_at"} for the latest view
+        of [start_date, end_date], or None. as_of is the date of the newest stored
+        bar on or before end_date (DataAgent.last_bar_date); None always misses,
+        and so does a snapshot that is not current for end_date.
+        """
+        if as_of is None:
+            return None
+        end_date = pd.Timestamp(end_date).normalize()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT indicators, analysis, bars, computed_at FROM snapshots "
+                "WHERE ticker = ? AND lookback = ? AND as_of = ? AND (end >= ? OR as_of >= ?)",
+                (ticker, lookback_days(start_date, end_date), _day(as_of),
+                 _day(end_date), _day(end_date - pd.offsets.BDay(1))),
+            ).fetchone()
+        if row is None:
+            return None
+
+        indicators, analysis, bars, computed_at = row
+        df = pd.read_json(StringIO(bars), orient="split", convert_dates=False)
+        df["Date"] = pd.to_datetime(df["Date"])
+        return {
+            "df": df,
+            "indicators": json.loads(indicators),
+            "analysis": json.loads(analysis),
+            "computed_at": computed_at,
+        }
+
+    def put(self, ticker, start_date, end_date, df, indicators, analysis):
+        """Store one window and drop older windows of the same ticker and lookback."""
+        lookback = lookback_days(start_date, end_date)
+        as_of = _day(df["Date"].max())
+        with self._connect() as conn:
+            conn.execute("DELETE FROM snapshots WHERE ticker = ? AND lookback = ? AND as_of < ?",
+                         (ticker, lookback, as_of))
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    ticker, lookback, as_of, _day(start_date), _day(end_date),
+                    datetime.now().isoformat(timespec="seconds"),
+                    json.dumps(indicators),
+                    json.dumps(analysis),
+                    df.to_json(orient="split", index=False, date_format="iso"),
+                ),
+            )
+
+
+def precompute(data_agent, store, tickers, end_date, lookback_days=STANDARD_LOOKBACK_DAYS):
+    """Compute and store the standard-window snapshot for each ticker. Returns {ticker: error}."""
+    end_date = pd.Timestamp(end_date)
+    start_date = end_date - pd.Timedelta(days=lookback_days)
+    failures = {}
+
+    for user_ticker in tickers:
+        ticker = user_ticker
+        try:
+            # a delisted symbol raises here; it is one failure, not the end of the run
+            ticker = data_agent.normalize_ticker(user_ticker)
+            df = data_agent.get_data(ticker, start_date, end_date)
+            df = data_agent.compute_indicators(df)
+            indicators = data_agent.get_indicator_summary(df)
+            analysis = AnalysisAgent(ticker).run(df, indicators)
+            store.put(ticker, start_date, end_date, df, indicators, analysis)
+            print(f"[ok]   {ticker}: {analysis['signal']} (score {analysis['score']})")
+        except Exception as e:
+            failures[ticker] = f"{type(e).__name__}: {e}"
+            print(f"[fail] {ticker}: {e}")
+
+    return failures
+
+
+def main():
+    today = pd.Timestamp.today().normalize()
+
+    parser = argparse.ArgumentParser(description="Precompute standard-window analysis snapshots.")
+    parser.add_argument("--end", default=str(today.date()), help="last day of the window (default: today)")
+    parser.add_argument("--lookback", type=int, default=STANDARD_LOOKBACK_DAYS, help="window length in days")
+    parser.add_argument("--watchlist", help="text file with one ticker per line (default: every ticker in the CSV)")
+    parser.add_argument("--csv", default="master_investment_dataset.csv")
+    parser.add_argument("--db", default=SNAPSHOT_DB)
+    args = parser.parse_args()
+
+    data_agent = DataAgent(args.csv, mmap=True)
+    if args.watchlist:
+        from batch import read_watchlist
+        tickers = read_watchlist(args.watchlist)
+    else:
+        tickers = list(data_agent.data["Ticker"].cat.categories)
+
+    started = time.perf_counter()
+    failures = precompute(data_agent, SnapshotStore(args.db), tickers, args.end, args.lookback)
+    elapsed = time.perf_counter() - started
+
+    print(f"\nSnapshots: {len(tickers) - len(failures)} stored, {len(failures)} failed in {elapsed:.1f}s")
+    for ticker, error in failures.items():
+        print(f"  - {ticker}: {error}")
+
+
+if __name__ == "__main__":
+    main()
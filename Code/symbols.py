@@ -0,0 +1,152 @@
+# symbols.py
+"""
+Local NSE symbol resolver, built from NSE's equity symbol master (EQUITY_L.csv,
+columns "SYMBOL" and "NAME OF COMPANY").
+
+- resolve(text)   : exact O(1) lookup on symbols, aliases and company names,
+                    with fuzzy name matching as a fallback. Unknown input raises
+                    ValueError before any network call is made.
+- complete(prefix): autocomplete over symbols and company names using a sorted
+                    key array and binary search.
+- fuzzy(text)     : closest company names, using a trigram index to pick
+                    candidates and difflib to rank them.
+"""
+import bisect
+import difflib
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+
+import pandas as pd
+
+SYMBOL_MASTER = "EQUITY_L.csv"
+
+# Suffixes that users often include or leave out of company names
+_NAME_NOISE = re.compile(r"\b(LIMITED|LTD|INDIA|CORPORATION|CORP|COMPANY|CO)\b\.?")
+
+
+def normalize_name(text):
+    s = re.sub(r"[^A-Z0-9& ]", " ", text.upper())
+    s = _NAME_NOISE.sub(" ", s)
+    return " ".join(s.split())
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SymbolResolver:
+    def __init__(self, symbols, aliases=None):
+        """
+        symbols : {SYMBOL: company name}, e.g. {"RELIANCE": "Reliance Industries Limited"}
+        aliases : {user text: Yahoo ticker}, checked before the symbol master
+        """
+        self.names = dict(symbols)
+
+        # Exact lookup: symbol, normalized company name and aliases -> Yahoo ticker
+        self.exact = {}
+        for symbol, name in self.names.items():
+            self.exact[normalize_name(name)] = symbol + ".NS"
+        for symbol in self.names:
+            self.exact[symbol] = symbol + ".NS"
+        for alias, ticker in (aliases or {}).items():
+            self.exact[alias.upper()] = ticker
+            # resolve must be idempotent, also for alias targets missing from the master
+            self.exact.setdefault(ticker.upper(), ticker)
+
+        # Prefix index: sorted (key, symbol) pairs over symbols and normalized names
+        self.prefix_keys = sorted(
+            [(symbol, symbol) for symbol in self.names]
+            + [(normalize_name(name), symbol) for symbol, name in self.names.items()]
+        )
+
+        # Trigram index over normalized names for fuzzy matching
+        self.name_keys = [normalize_name(self.names[s]) for s in self.names]
+        self.name_symbols = list(self.names)
+        self.trigram_index = {}
+        for i, key in enumerate(self.name_keys):
+            for gram in _trigrams(key):
+                self.trigram_index.setdefault(gram, []).append(i)
+
+    @classmethod
+    def from_csv(cls, path, aliases=None):
+        df = pd.read_csv(path, usecols=lambda c: c.strip() in ("SYMBOL", "NAME OF COMPANY"))
+        df.columns = [c.strip() for c in df.columns]
+        symbols = dict(zip(df["SYMBOL"].str.strip().str.upper(), df["NAME OF COMPANY"].str.strip()))
+        return cls(symbols, aliases)
+
+    def resolve(self, user_input):
+        """Map a symbol, alias or company name to its Yahoo ticker, or raise ValueError."""
+        s = user_input.strip().upper()
+        if s in self.exact:
+            return self.exact[s]
+        if s.endswith(".NS") and s[:-3] in self.names:
+            return s
+
+        name = normalize_name(s)
+        if name in self.exact:
+            return self.exact[name]
+
+        matches = self.fuzzy(s, limit=3)
+        if matches and matches[0][2] >= 0.85:
+            return matches[0][0] + ".NS"
+
+        hint = ", ".join(symbol for symbol, _, _ in matches)
+        raise ValueError(f"Unknown NSE symbol '{user_input}'." + (f" Did you mean: {hint}?" if hint else ""))
+
+    def complete(self, prefix, limit=10):
+        """Return up to limit (symbol, company name) pairs whose symbol or name starts with prefix."""
+        p = prefix.strip().upper()
+        if not p:
+            return []
+        keys = [p, normalize_name(p)] if normalize_name(p) != p else [p]
+
+        results = []
+        for key in keys:
+            i = bisect.bisect_left(self.prefix_keys, (key, ""))
+            while i < len(self.prefix_keys) and self.prefix_keys[i][0].startswith(key):
+                symbol = self.prefix_keys[i][1]
+                if symbol not in results:
+                    results.append(symbol)
+                    if len(results) >= limit:
+                        break
+                i += 1
+        return [(symbol, self.names[symbol]) for symbol in results[:limit]]
+
+    def fuzzy(self, text, limit=5, candidates=50):
+        """Return up to limit (symbol, company name, similarity) tuples, best first."""
+        key = normalize_name(text)
+        if not key:
+            return []
+
+        # Shortlist names that share the most trigrams with the query, then rank precisely
+        overlap = Counter()
+        for gram in _trigrams(key):
+            for i in self.trigram_index.get(gram, ()):
+                overlap[i] += 1
+
+        scored = []
+        for i, _ in overlap.most_common(candidates):
+            ratio = difflib.SequenceMatcher(None, key, self.name_keys[i]).ratio()
+            scored.append((ratio, i))
+        scored.sort(reverse=True)
+
+        return [
+            (self.name_symbols[i], self.names[self.name_symbols[i]], round(ratio, 3))
+            for ratio, i in scored[:limit]
+        ]
+
+
+@lru_cache(maxsize=4)
+def _load_resolver(path, mtime):
+    from DataAgent import INDIAN_TICKER_MAP
+    return SymbolResolver.from_csv(path, aliases=INDIAN_TICKER_MAP)
+
+
+def load_resolver(path=SYMBOL_MASTER):
+    """Shared resolver for path, rebuilt only when the file changes. None if the file is missing."""
+    if not os.path.exists(path):
+        return None
+    return _load_resolver(path, os.path.getmtime(path))
@@ -0,0 +1,356 @@
+# tracing.py
+"""
+Lightweight tracing and metrics for the agent pipeline.
+
+A Trace wraps one workflow run and records, per stage, wall time, CPU time
+and (optionally) peak memory. Agents report cache lookups, external call
+latencies and row/article counts through the module-level helpers below;
+these always update the process-wide METRICS registry and are also attached
+to the Trace active in the current thread, if there is one.
+
+Exports (configured through environment variables):
+- TRACE_LOG     : JSON-lines file, one line per finished trace (default traces.jsonl, "" disables)
+- METRICS_FILE  : Prometheus text-format file, rewritten after every trace (default metrics.prom, "" disables)
+- METRICS_PORT  : if set, serve_metrics() exposes /metrics on this port
+- TRACE_MEMORY  : "1" turns on tracemalloc for per-stage peak memory (adds overhead).
+                  tracemalloc is process-wide: it runs while any memory trace is
+                  active, and a stage's peak is only recorded when no other memory
+                  trace overlapped it, since concurrent runs cannot be told apart
+- TRACE_PROFILE : directory; if set, every stage runs under cProfile and writes
+                  <dir>/<trace>-<time>-<id>/<stage>.prof (open with snakeviz or
+                  python -m pstats) plus a .txt summary of the top calls
+"""
+import cProfile
+import json
+import os
+import pstats
+import resource
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TRACE_LOG = os.environ.get("TRACE_LOG", "traces.jsonl")
+METRICS_FILE = os.environ.get("METRICS_FILE", "metrics.prom")
+TRACE_MEMORY = os.environ.get("TRACE_MEMORY", "") == "1"
+TRACE_PROFILE = os.environ.get("TRACE_PROFILE", "")
+
+METRIC_PREFIX = "finagent_"
+
+_current_trace = ContextVar("current_trace", default=None)
+
+# tracemalloc is shared by every Trace with memory=True in the process
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False   # started by us (not by the caller), so we stop it
+_tracemalloc_entries = 0     # bumped on every memory trace start, to detect overlap
+
+
+# ------------------ Metrics registry ------------------
+class MetricsRegistry:
+    """Thread-safe counters and summaries (count + sum) keyed by name and labels."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.summaries = {}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            count, total = self.summaries.get(key, (0, 0.0))
+            self.summaries[key] = (count + 1, total + value)
+
+    def to_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        with self.lock:
+            counters = dict(self.counters)
+            summaries = dict(self.summaries)
+
+        lines = []
+        for kind, metrics in (("counter", counters), ("summary", summaries)):
+            for name in sorted({n for n, _ in metrics}):
+                full_name = METRIC_PREFIX + name
+                lines.append(f"# TYPE {full_name} {kind}")
+                for (n, labels), value in sorted(metrics.items()):
+                    if n != name:
+                        continue
+                    label_str = _format_labels(labels)
+                    if kind == "counter":
+                        lines.append(f"{full_name}{label_str} {value}")
+                    else:
+                        count, total = value
+                        lines.append(f"{full_name}_count{label_str} {count}")
+                        lines.append(f"{full_name}_sum{label_str} {total:.6f}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Atomically rewrite path with the current metrics (for node_exporter's textfile collector)."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in labels)
+    return "{" + inner + "}"
+
+
+METRICS = MetricsRegistry()
+
+
+# ------------------ Per-run trace ------------------
+class Trace:
+    """
+    Context manager for one traced run:
+
+        with Trace("financial_workflow", ticker="RELIANCE.NS") as trace:
+            with trace.stage("data"):
+                ...
+            trace.count("rows", len(df))
+
+    On exit the trace is appended to TRACE_LOG and METRICS_FILE is refreshed.
+    Pass profile=<dir> (or set TRACE_PROFILE) to profile each stage of this run.
+    """
+
+    def __init__(self, name, memory=None, profile=None, **attrs):
+        self.name = name
+        self.attrs = attrs
+        self.memory = TRACE_MEMORY if memory is None else memory
+        self.profile_dir = TRACE_PROFILE if profile is None else profile
+        self.stages = []
+        self.counts = {}
+        self.caches = {}
+        self.external_calls = []
+        self.status = "ok"
+        self.error = None
+
+    def __enter__(self):
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self._t0 = time.perf_counter()
+        self._cpu0 = time.thread_time()
+        self._token = _current_trace.set(self)
+        if self.memory:
+            _acquire_tracemalloc()
+        if self.profile_dir:
+            run_id = f"{self.name}-{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+            self.profile_path = os.path.join(self.profile_dir, run_id)
+            os.makedirs(self.profile_path, exist_ok=True)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wall_s = time.perf_counter() - self._t0
+        self.cpu_s = time.thread_time() - self._cpu0
+        _current_trace.reset(self._token)
+        if self.memory:
+            _release_tracemalloc()
+
+        if exc_type is not None:
+            self.status = "error"
+            self.error = f"{exc_type.__name__}: {exc}"
+
+        METRICS.inc("runs_total", trace=self.name, status=self.status)
+        METRICS.observe("run_wall_seconds", self.wall_s, trace=self.name)
+        self.export()
+        return False
+
+    @contextmanager
+    def stage(self, name):
+        """Time one agent call: wall time, CPU time of this thread, peak traced memory."""
+        # peaks are only attributable to this stage if no other memory trace runs meanwhile
+        solo_since = _solo_memory_trace() if self.memory else None
+        if solo_since is not None:
+            tracemalloc.reset_peak()
+        profiler = self._start_profiler()
+        t0 = time.perf_counter()
+        cpu0 = time.thread_time()
+        status = "ok"
+        try:
+            yield
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            record = {
+                "stage": name,
+                "wall_s": round(time.perf_counter() - t0, 6),
+                "cpu_s": round(time.thread_time() - cpu0, 6),
+                "status": status,
+            }
+            if solo_since is not None and _solo_memory_trace() == solo_since:
+                record["peak_mem_mib"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 3)
+            if profiler is not None:
+                profiler.disable()
+                record["profile"] = self._dump_profile(profiler, name)
+            self.stages.append(record)
+            METRICS.observe("stage_wall_seconds", record["wall_s"], stage=name)
+            METRICS.observe("stage_cpu_seconds", record["cpu_s"], stage=name)
+            if status == "error":
+                METRICS.inc("stage_errors_total", stage=name)
+
+    def _start_profiler(self):
+        if not self.profile_dir:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler per process; a concurrent run holds it
+            print(f"Profiler busy; stage not profiled in {self.name}.")
+            return None
+        return profiler
+
+    def _dump_profile(self, profiler, stage):
+        path = os.path.join(self.profile_path, stage + ".prof")
+        profiler.dump_stats(path)
+        with open(os.path.join(self.profile_path, stage + ".txt"), "w") as f:
+            pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(30)
+        return path
+
+    def count(self, name, value):
+        self.counts[name] = self.counts.get(name, 0) + value
+        METRICS.inc(f"{name}_total", value)
+
+    def to_dict(self):
+        return {
+            "trace": self.name,
+            "started_at": self.started_at,
+            **self.attrs,
+            "status": self.status,
+            "error": self.error,
+            "wall_s": round(self.wall_s, 6),
+            "cpu_s": round(self.cpu_s, 6),
+            # process-wide high-water mark (ru_maxrss is KiB on Linux)
+            "max_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "stages": self.stages,
+            "counts": self.counts,
+            "caches": self.caches,
+            "external_calls": self.external_calls,
+        }
+
+    def export(self):
+        if TRACE_LOG:
+            line = json.dumps(self.to_dict(), default=str)
+            with _export_lock, open(TRACE_LOG, "a") as f:
+                f.write(line + "\n")
+        if METRICS_FILE:
+            with _export_lock:
+                METRICS.write_prometheus(METRICS_FILE)
+
+
+_export_lock = threading.Lock()
+
+
+def _acquire_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_owned, _tracemalloc_entries
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+        _tracemalloc_entries += 1
+
+
+def _release_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+
+
+def _solo_memory_trace():
+    """Entry counter if exactly one memory trace is active, else None."""
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 1 and tracemalloc.is_tracing():
+            return _tracemalloc_entries
+        return None
+
+
+# ------------------ Helpers used by the agents ------------------
+def current_trace():
+    return _current_trace.get()
+
+
+def cache(cache_name, hit):
+    """Record a cache lookup (hit=True/False) for e.g. the 'data' cache."""
+    result = "hit" if hit else "miss"
+    METRICS.inc("cache_requests_total", cache=cache_name, result=result)
+    trace = current_trace()
+    if trace is not None:
+        key = f"{cache_name}_{result}"
+        trace.caches[key] = trace.caches.get(key, 0) + 1
+
+
+def count(name, value):
+    """Add to a named count (rows, articles, ...) on the metrics and the active trace."""
+    trace = current_trace()
+    if trace is not None:
+        trace.count(name, value)
+    else:
+        METRICS.inc(f"{name}_total", value)
+
+
+@contextmanager
+def external_call(service):
+    """Time a call to an upstream service (yahoo, rss, groq); errors are counted and re-raised."""
+    t0 = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - t0
+        METRICS.observe("external_call_seconds", elapsed, service=service)
+        if status == "error":
+            METRICS.inc("external_call_errors_total", service=service)
+        trace = current_trace()
+        if trace is not None:
+            trace.external_calls.append(
+                {"service": service, "latency_s": round(elapsed, 6), "status": status}
+            )
+
+
+# ------------------ Prometheus endpoint ------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = METRICS.to_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+_server = None
+
+
+def serve_metrics(port):
+    """Start a background /metrics endpoint once per process; later calls are no-ops."""
+    global _server
+    if _server is None:
+        _server = ThreadingHTTPServer(("0.0.0.0", int(port)), _MetricsHandler)
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+        print(f"Serving metrics on :{port}/metrics")
+    return _server
@@ -0,0 +1,301 @@
+# yahoo_fetcher.py
+"""
+Resilient access to Yahoo Finance price history.
+
+Every download goes through one process-wide YahooFetcher that
+- paces requests with a token bucket (YAHOO_RATE per second, bursts of YAHOO_BURST),
+- retries transient failures (timeouts, connection errors, HTTP 429/5xx) with
+  exponential backoff and full jitter, up to YAHOO_MAX_RETRIES times,
+- trips a circuit breaker after YAHOO_BREAKER_THRESHOLD consecutive transient
+  failures and fails fast for YAHOO_BREAKER_RESET seconds before letting a
+  single trial request through,
+- raises typed FetchError subclasses instead of returning empty frames; any
+  other exception from a transport (a payload it could not parse, a bug)
+  becomes a PermanentFetchError.
+
+Two transports are available: the yfinance library (default) and a plain HTTP
+client for Yahoo's chart API, selected by setting YAHOO_CHART_URL. The latter
+is what fake_yahoo.py emulates, so the retry/breaker behaviour can be exercised
+against a local server that injects failures.
+"""
+import json
+import os
+import random
+import socket
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import pandas as pd
+
+import tracing
+
+OHLCV = ["Date", "Open", "High", "Low", "Close", "Volume"]
+
+
+# ------------------ Errors ------------------
+class FetchError(Exception):
+    """Base class for price download failures."""
+
+
+class TransientFetchError(FetchError):
+    """Timeouts, dropped connections, HTTP 5xx: worth retrying."""
+
+
+class RateLimitedError(TransientFetchError):
+    """HTTP 429 / upstream throttling."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class PermanentFetchError(FetchError):
+    """The request itself is wrong (bad symbol format, HTTP 4xx); retrying will not help."""
+
+
+class NoDataError(FetchError, ValueError):
+    """Upstream answered but has no bars for this ticker and range."""
+
+
+class CircuitOpenError(FetchError):
+    """Upstream is considered down; the call was not attempted."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# ------------------ Pacing and failure isolation ------------------
+class TokenBucket:
+    """Allows `rate` requests per second on average with bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """closed -> open after `threshold` consecutive failures -> half-open after `reset_timeout` s."""
+
+    def __init__(self, threshold=5, reset_timeout=60):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def before_call(self):
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half_open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return
+            retry_after = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+        tracing.METRICS.inc("yahoo_circuit_rejections_total")
+        raise CircuitOpenError("Yahoo Finance circuit is open; not calling upstream", retry_after)
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_in_flight or self.failures >= self.threshold:
+                if self.opened_at is None or self.trial_in_flight:
+                    tracing.METRICS.inc("yahoo_circuit_opened_total")
+                self.opened_at = time.monotonic()
+                self.trial_in_flight = False
+
+    def abort_trial(self):
+        """The call was interrupted without an answer either way; let the next one try."""
+        with self.lock:
+            self.trial_in_flight = False
+
+
+# ------------------ Transports ------------------
+class YFinanceTransport:
+    """Downloads through the yfinance library, translating its swallowed errors."""
+
+    def download(self, ticker, start=None, end=None, period=None, interval="1d"):
+        import yfinance as yf
+
+        try:
+            df = yf.download(ticker, start=start, end=end, period=period,
+                             interval=interval, progress=False)
+        except Exception as e:
+            raise TransientFetchError(f"{type(e).__name__}: {e}") from e
+
+        if df is None or df.empty:
+            # yfinance reports per-ticker failures in a module dict instead of raising
+            errors = getattr(getattr(yf, "shared", None), "_ERRORS", {}) or {}
+            message = str(errors.get(ticker, ""))
+            lowered = message.lower()
+            if "rate" in lowered or "too many requests" in lowered:
+                raise RateLimitedError(message)
+            if any(s in lowered for s in ("timed out", "timeout", "dnserror", "connection", "curl")):
+                raise TransientFetchError(message)
+            raise NoDataError(f"Yahoo returned no data for {ticker}" + (f": {message}" if message else ""))
+
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.get_level_values(0)
+        df = df.reset_index().rename(columns={"Datetime": "Date"})
+        return df[OHLCV]
+
+
+class ChartAPITransport:
+    """Minimal HTTP client for Yahoo's /v8/finance/chart endpoint (or a local fake of it)."""
+
+    def __init__(self, base_url, timeout=10):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def download(self, ticker, start=None, end=None, period=None, interval="1d"):
+        params = {"interval": interval}
+        if period:
+            params["range"] = period
+        else:
+            params["period1"] = int(pd.Timestamp(start).timestamp())
+            params["period2"] = int(pd.Timestamp(end).timestamp())
+        url = (f"{self.base_url}/v8/finance/chart/{urllib.parse.quote(ticker)}?"
+               + urllib.parse.urlencode(params))
+
+        try:
+            request = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                payload = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            if e.code == 429:
+                retry_after = e.headers.get("Retry-After")
+                raise RateLimitedError("HTTP 429", float(retry_after) if retry_after else None) from e
+            if e.code >= 500:
+                raise TransientFetchError(f"HTTP {e.code}") from e
+            if e.code == 404:
+                raise NoDataError(f"Yahoo has no chart for {ticker}") from e
+            raise PermanentFetchError(f"HTTP {e.code}") from e
+        except (urllib.error.URLError, socket.timeout, ConnectionError, json.JSONDecodeError) as e:
+            raise TransientFetchError(f"{type(e).__name__}: {e}") from e
+
+        result = (payload.get("chart", {}).get("result") or [None])[0]
+        if not result or not result.get("timestamp"):
+            raise NoDataError(f"Yahoo returned no data for {ticker}")
+
+        quote = result["indicators"]["quote"][0]
+        tz = result.get("meta", {}).get("exchangeTimezoneName", "Asia/Kolkata")
+        dates = pd.to_datetime(result["timestamp"], unit="s", utc=True).tz_convert(tz).tz_localize(None)
+        if interval == "1d":
+            dates = dates.normalize()
+        df = pd.DataFrame({
+            "Date": dates,
+            "Open": quote["open"],
+            "High": quote["high"],
+            "Low": quote["low"],
+            "Close": quote["close"],
+            "Volume": quote["volume"],
+        })
+        return df.dropna(subset=["Close"])
+
+
+# ------------------ Fetcher ------------------
+class YahooFetcher:
+    def __init__(self, transport=None, rate=2.0, burst=5, max_retries=4,
+                 backoff_base=0.5, backoff_cap=8.0, breaker=None):
+        self.transport = transport or YFinanceTransport()
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = breaker or CircuitBreaker()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+    def fetch(self, ticker, start=None, end=None, period=None, interval="1d"):
+        """Return a frame with Date, Ticker, Open, High, Low, Close, Volume, or raise FetchError."""
+        for attempt in range(self.max_retries + 1):
+            self.breaker.before_call()
+            self.bucket.acquire()
+            try:
+                with tracing.external_call("yahoo"):
+                    df = self.transport.download(ticker, start=start, end=end,
+                                                 period=period, interval=interval)
+            except TransientFetchError as e:
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    raise
+                # full jitter: sleep a random time up to the exponential cap
+                delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+                if isinstance(e, RateLimitedError) and e.retry_after:
+                    # honour Retry-After, but never let upstream park a worker for long
+                    delay = max(delay, min(e.retry_after, self.backoff_cap))
+                tracing.METRICS.inc("yahoo_retries_total", reason=type(e).__name__)
+                print(f"Yahoo {type(e).__name__} for {ticker} ({e}); retry {attempt + 1} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            except FetchError:
+                # upstream answered; it is healthy even if this request failed
+                self.breaker.record_success()
+                raise
+            except Exception as e:
+                # unexpected payload or transport bug: count it, and never leave a
+                # half-open trial marked in flight (that would keep the circuit open)
+                self.breaker.record_failure()
+                raise PermanentFetchError(f"{type(e).__name__}: {e}") from e
+            except BaseException:
+                self.breaker.abort_trial()
+                raise
+
+            self.breaker.record_success()
+            df.insert(1, "Ticker", ticker)
+            return df
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher():
+    """Process-wide fetcher so every agent shares one rate limit and one breaker."""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            chart_url = os.environ.get("YAHOO_CHART_URL")
+            _fetcher = YahooFetcher(
+                transport=ChartAPITransport(chart_url) if chart_url else None,
+                rate=float(os.environ.get("YAHOO_RATE", 2)),
+                burst=int(os.environ.get("YAHOO_BURST", 5)),
+                max_retries=int(os.environ.get("YAHOO_MAX_RETRIES", 4)),
+                breaker=CircuitBreaker(
+                    threshold=int(os.environ.get("YAHOO_BREAKER_THRESHOLD", 5)),
+                    reset_timeout=float(os.environ.get("YAHOO_BREAKER_RESET", 60)),
+                ),
+            )
+        return _fetcher